@@ -134,6 +134,13 @@ CREATE TABLE `places` (
   PRIMARY KEY (`id`),
   KEY `city_id` (`city_id`),
   KEY `user_id` (`user_id`),
+  KEY `ix_places_city_id_price_by_night` (`city_id`,`price_by_night`),
+  KEY `ix_places_number_rooms` (`number_rooms`),
+  KEY `ix_places_number_bathrooms` (`number_bathrooms`),
+  KEY `ix_places_max_guest` (`max_guest`),
+  KEY `ix_places_price_by_night` (`price_by_night`),
+  KEY `ix_places_latitude_longitude` (`latitude`,`longitude`),
+  FULLTEXT KEY `ft_places_name_description` (`name`,`description`),
   CONSTRAINT `places_ibfk_1` FOREIGN KEY (`city_id`) REFERENCES `cities` (`id`),
   CONSTRAINT `places_ibfk_2` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
@@ -166,6 +173,7 @@ CREATE TABLE `reviews` (
   PRIMARY KEY (`id`),
   KEY `place_id` (`place_id`),
   KEY `user_id` (`user_id`),
+  FULLTEXT KEY `ft_reviews_text` (`text`),
   CONSTRAINT `reviews_ibfk_1` FOREIGN KEY (`place_id`) REFERENCES `places` (`id`),
   CONSTRAINT `reviews_ibfk_2` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
@@ -10,15 +10,37 @@ Flask app configuration:
 - Registers blueprints for API routes
 - Adds CORS support for handling cross-origin requests
 - Provides error handlers for HTTP 404 and 405 errors
+- Encodes JSON responses with models.engine.serializer
+- Counts the SQL queries of every request when HBNB_QUERY_DEBUG is set
 """
 
 from flask import Flask, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS  # Import CORS to allow cross-origin requests
 from models import storage
+from models.engine import serializer
+from models.engine.query_counter import watch
 from api.v1.views import app_views
 
+
+class SerializerJSONProvider(JSONProvider):
+    """
+    JSON provider backed by models.engine.serializer, so responses use
+    orjson when it is installed and encode datetimes natively.
+    """
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        return serializer.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        """Deserialize the JSON string or bytes s."""
+        return serializer.loads(s)
+
+
 # Create the Flask application
 app = Flask(__name__)
+app.json = SerializerJSONProvider(app)
 
 # Enable CORS for all routes under /api/v1/*
 # This allows any origin to make requests to the API
@@ -28,6 +50,9 @@ CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 # Register the blueprint for handling API routes
 app.register_blueprint(app_views)
 
+# Flag the requests running the same query over and over (N+1 queries)
+watch(app, storage)
+
 
 @app.teardown_appcontext
 def teardown(exception):
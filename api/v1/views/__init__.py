@@ -1,4 +1,4 @@
-from flask import Blueprint
+from flask import Blueprint, Response, stream_with_context
 from models import storage
 from models.user import User
 from models.state import State
@@ -22,6 +22,35 @@ def valid_models():
         'Review': Review
     }
 
+
+def jsonify_object(obj):
+    """Return the JSON response of obj, made of the JSON text the storage
+    caches for it."""
+    return Response(storage.to_json(obj), mimetype="application/json")
+
+
+def jsonify_objects(objs, chunk_size=100):
+    """Return the JSON array response of objs, spliced together from the
+    JSON text the storage caches for each of them.
+
+    objs can be an iterator, such as storage.iter(), that is only read
+    while the response is sent, chunk_size objects at a time.
+    """
+    def generate():
+        """yield the JSON array a few objects at a time"""
+        chunk = []
+        sep = "["
+        for obj in objs:
+            chunk.append(sep + storage.to_json(obj))
+            sep = ", "
+            if len(chunk) >= chunk_size:
+                yield "".join(chunk)
+                chunk = []
+        yield "".join(chunk) + ("]" if sep == ", " else "[]")
+
+    return Response(stream_with_context(generate()),
+                    mimetype="application/json")
+
 # Register blueprints for different app modules
 from api.v1.views.index import *
 from api.v1.views.states import *
@@ -30,3 +59,4 @@ from api.v1.views.amenities import *
 from api.v1.views.places import *
 from api.v1.views.places_reviews import *
 from api.v1.views.users import *
+from api.v1.views.search import *
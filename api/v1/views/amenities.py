@@ -2,7 +2,7 @@
 """View for Amenity objects that handles all default RESTFul API actions."""
 
 from flask import jsonify, abort, request
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_object, jsonify_objects
 from models import storage
 from models.amenity import Amenity
 
@@ -10,8 +10,8 @@ from models.amenity import Amenity
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 def get_amenities():
     """Retrieves the list of all Amenity objects."""
-    amenities = storage.all(Amenity).values()
-    return jsonify([amenity.to_dict() for amenity in amenities])
+    amenities = storage.iter(Amenity)
+    return jsonify_objects(amenities)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'],
@@ -21,7 +21,7 @@ def get_amenity(amenity_id):
     amenity = storage.get(Amenity, amenity_id)
     if not amenity:
         abort(404)
-    return jsonify(amenity.to_dict())
+    return jsonify_object(amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['DELETE'],
@@ -48,7 +48,7 @@ def create_amenity():
     new_amenity = Amenity(**data)
     storage.new(new_amenity)
     storage.save()
-    return jsonify(new_amenity.to_dict()), 201
+    return jsonify_object(new_amenity), 201
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['PUT'],
@@ -67,4 +67,4 @@ def update_amenity(amenity_id):
         if key not in ignored_keys:
             setattr(amenity, key, value)
     storage.save()
-    return jsonify(amenity.to_dict()), 200
+    return jsonify_object(amenity), 200
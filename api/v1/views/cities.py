@@ -5,7 +5,7 @@ from flask import jsonify, abort, request
 from models import storage
 from models.city import City
 from models.state import State
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_object, jsonify_objects
 
 
 @app_views.route('/states/<state_id>/cities', methods=['GET'],
@@ -15,7 +15,8 @@ def get_cities(state_id):
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    return jsonify([city.to_dict() for city in state.cities])
+    cities = storage.query(City).filter(state_id=state.id).iter()
+    return jsonify_objects(cities)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'], strict_slashes=False)
@@ -24,7 +25,7 @@ def get_city(city_id):
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    return jsonify(city.to_dict())
+    return jsonify_object(city)
 
 
 @app_views.route('/cities/<city_id>', methods=['DELETE'], strict_slashes=False)
@@ -55,7 +56,7 @@ def create_city(state_id):
     new_city = City(**city_data)
     new_city.state_id = state_id
     new_city.save()
-    return jsonify(new_city.to_dict()), 201
+    return jsonify_object(new_city), 201
 
 
 @app_views.route('/cities/<city_id>', methods=['PUT'], strict_slashes=False)
@@ -74,4 +75,4 @@ def update_city(city_id):
         if key not in ignored_keys:
             setattr(city, key, value)
     city.save()
-    return jsonify(city.to_dict()), 200
+    return jsonify_object(city), 200
@@ -27,7 +27,6 @@ def count_each_model():
         'Amenity': 'amenities',
         'Review': 'reviews'
     }
-    for name, model in valid_models().items():
-        count = storage.count(model)
+    for name, count in storage.count_many(valid_models().values()).items():
         counts[model_names[name]] = count
     return jsonify(counts)
@@ -8,7 +8,7 @@ from models import storage
 from models.city import City
 from models.place import Place
 from models.user import User
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_object, jsonify_objects
 from flask import abort
 
 
@@ -30,9 +30,48 @@ def get_places_by_city(city_id):
     if not city:
         abort(404, description="City not found")
 
-    places = storage.all(Place).values()
-    places_list = [place.to_dict()
-                   for place in places if place.city_id == city_id]
+    places = storage.query(Place).filter(city_id=city_id).iter()
+
+    return jsonify_objects(places)
+
+
+@app_views.route('/places/nearby', methods=['GET'])
+def get_places_nearby():
+    """
+    Retrieves the places within a radius of a point, nearest first.
+
+    Query parameters:
+        lat (float): Latitude of the center, in degrees.
+        lng (float): Longitude of the center, in degrees.
+        radius_km (float): Radius of the search in km, 10 by default.
+        limit (int): Maximum number of places to return.
+
+    Returns:
+        JSON response containing a list of places, each with its
+        distance_km from the center.
+
+    Raises:
+        400: If a parameter is missing or out of range.
+    """
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius_km = float(request.args.get('radius_km', 10))
+        limit = request.args.get('limit')
+        limit = int(limit) if limit is not None else None
+    except (KeyError, ValueError):
+        abort(400, description="lat and lng are required numbers")
+
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180 or \
+            not radius_km >= 0 or (limit is not None and limit < 0):
+        abort(400, description="Parameter out of range")
+
+    places = storage.nearby(Place, lat, lng, radius_km, limit)
+    places_list = []
+    for place, distance in places:
+        place_dict = place.to_dict(raw_dates=True)
+        place_dict['distance_km'] = round(distance, 3)
+        places_list.append(place_dict)
 
     return jsonify(places_list)
 
@@ -55,7 +94,7 @@ def get_place(place_id):
     if not place:
         abort(404, description="Place not found")
 
-    return jsonify(place.to_dict())
+    return jsonify_object(place)
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'])
@@ -122,7 +161,7 @@ def create_place(city_id):
     place.city_id = city_id
     place.save()
 
-    return jsonify(place.to_dict()), 201
+    return jsonify_object(place), 201
 
 
 @app_views.route('/places/<place_id>', methods=['PUT'])
@@ -154,4 +193,4 @@ def update_place(place_id):
             setattr(place, key, value)
 
     place.save()
-    return jsonify(place.to_dict()), 200
+    return jsonify_object(place), 200
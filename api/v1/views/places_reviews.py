@@ -2,7 +2,7 @@
 """This file handles RESTful actions for Review objects under places."""
 
 from flask import request, jsonify
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_object, jsonify_objects
 from models import storage
 from models.place import Place
 from models.review import Review
@@ -19,10 +19,8 @@ def get_reviews_for_place(place_id):
     if not place:
         raise NotFound("Place not found")
 
-    reviews = storage.all(Review)
-    place_reviews = [review.to_dict() for review in reviews.values()
-                     if review.place_id == place.id]
-    return jsonify(place_reviews)
+    reviews = storage.query(Review).filter(place_id=place.id).iter()
+    return jsonify_objects(reviews)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
@@ -31,7 +29,7 @@ def get_review(review_id):
     review = storage.get(Review, review_id)
     if not review:
         raise NotFound("Review not found")
-    return jsonify(review.to_dict())
+    return jsonify_object(review)
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'],
@@ -79,7 +77,7 @@ def create_review(place_id):
     storage.new(new_review)
     storage.save()
 
-    return jsonify(new_review.to_dict), 201
+    return jsonify_object(new_review), 201
 
 
 @app_views.route('/reviews/<review_id>', methods=['PUT'], strict_slashes=False)
@@ -100,4 +98,4 @@ def update_review(review_id):
             setattr(review, key, value)
 
     review.save()
-    return jsonify(review.to_dict())
+    return jsonify_object(review)
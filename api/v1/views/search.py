@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""View for the full-text search over Place and Review objects."""
+
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from models import storage
+from models.place import Place
+from models.review import Review
+
+# value of the type parameter: class searched
+searchable = {"place": Place, "review": Review}
+
+
+@app_views.route('/search', methods=['GET'], strict_slashes=False)
+def search():
+    """Retrieves the places and reviews matching the words of q, best
+    match first, each with its score.
+
+    Query parameters: q, type (place or review, both by default) and
+    limit (20 by default).
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        abort(400, description="Missing q")
+    kind = request.args.get('type')
+    if kind is not None and kind not in searchable:
+        abort(400, description="type must be place or review")
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        abort(400, description="limit must be a number")
+    if limit < 0:
+        abort(400, description="limit must be a number")
+
+    found = []
+    for name, cls in searchable.items():
+        if kind is None or kind == name:
+            found += storage.search(cls, q, limit)
+    found.sort(key=lambda item: -item[1])
+    results = []
+    for obj, score in found[:limit]:
+        obj_dict = obj.to_dict(raw_dates=True)
+        obj_dict['score'] = round(score, 4)
+        results.append(obj_dict)
+    return jsonify(results)
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """New view for State objects that handles all default RESTFul API actions."""
 from flask import jsonify, abort, request
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_object, jsonify_objects
 from models import storage
 from models.state import State
 
@@ -9,8 +9,8 @@ from models.state import State
 @app_views.route("/states", methods=["GET"], strict_slashes=False)
 def get_states():
     """Retrieves the list of all State objects."""
-    states = storage.all(State).values()
-    return jsonify([state.to_dict() for state in states])
+    states = storage.iter(State)
+    return jsonify_objects(states)
 
 
 @app_views.route("/states/<state_id>", methods=["GET"], strict_slashes=False)
@@ -19,7 +19,7 @@ def get_state(state_id):
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    return jsonify(state.to_dict())
+    return jsonify_object(state)
 
 
 @app_views.route("/states/<state_id>", methods=["DELETE"],
@@ -45,7 +45,7 @@ def create_state():
     new_state = State(**data)
     storage.new(new_state)
     storage.save()
-    return jsonify(new_state.to_dict()), 201
+    return jsonify_object(new_state), 201
 
 
 @app_views.route("/states/<state_id>", methods=["PUT"], strict_slashes=False)
@@ -66,4 +66,4 @@ def update_state(state_id):
             setattr(state, key, value)
 
     storage.save()
-    return jsonify(state.to_dict()), 200
+    return jsonify_object(state), 200
@@ -5,6 +5,7 @@ It includes routes for getting, creating, updating, and deleting users.
 """
 
 from flask import Flask, jsonify, request, abort
+from api.v1.views import jsonify_objects
 from models import storage
 from models.user import User
 
@@ -17,10 +18,10 @@ def get_users():
     Retrieve the list of all User objects.
 
     Route responds to GET requests to fetch a list of all users in the system.
-    It returns a JSON rep of all the users' data using the to_dict() method.
+    It streams the JSON the storage caches for every user.
     """
-    users = storage.all(User).values()  # Get all users as a list
-    return jsonify([user.to_dict() for user in users])
+    users = storage.iter(User)
+    return jsonify_objects(users)
 
 
 @app.route('/api/v1/users/<user_id>', methods=['GET'])
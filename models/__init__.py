@@ -1,6 +1,10 @@
 #!/usr/bin/python3
 """
 initialize the models package
+
+The storage engine is created and loaded the first time models.storage is
+used, so tools importing a module of the package, like the binary_format
+converter, do not load the store.
 """
 
 from os import getenv
@@ -8,10 +12,18 @@ from os import getenv
 
 storage_t = getenv("HBNB_TYPE_STORAGE")
 
-if storage_t == "db":
-    from models.engine.db_storage import DBStorage
-    storage = DBStorage()
-else:
-    from models.engine.file_storage import FileStorage
-    storage = FileStorage()
-storage.reload()
+
+def __getattr__(name):
+    """create and reload the storage engine on first use of storage"""
+    global storage
+    if name != "storage":
+        raise AttributeError("module 'models' has no attribute " +
+                             repr(name))
+    if storage_t == "db":
+        from models.engine.db_storage import DBStorage
+        storage = DBStorage()
+    else:
+        from models.engine.file_storage import FileStorage
+        storage = FileStorage()
+    storage.reload()
+    return storage
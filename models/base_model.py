@@ -34,11 +34,11 @@ class BaseModel:
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
                 self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
                 self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -47,6 +47,36 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_record(cls, record):
+        """build an instance from a trusted record written by the storage,
+        without the checks and the setattr() calls of __init__"""
+        if models.storage_t == "db":
+            return cls(**record)
+        obj = cls.__new__(cls)
+        attrs = obj.__dict__
+        attrs.update(record)
+        attrs.pop("__class__", None)
+        for name in ("created_at", "updated_at"):
+            if type(attrs.get(name)) is str:
+                attrs[name] = datetime.fromisoformat(attrs[name])
+        return obj
+
+    @classmethod
+    def from_records(cls, records):
+        """return the list of the instances built by from_record() from
+        each of records"""
+        from_record = cls.from_record
+        return [from_record(record) for record in records]
+
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and reports the change to the storage"""
+            super().__setattr__(name, value)
+            storage = getattr(models, "storage", None)
+            if storage is not None:
+                storage.touch(self, name)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -58,16 +88,24 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self):
-        """returns a dictionary containing all keys/values of the instance"""
+    def to_dict(self, raw_dates=False):
+        """returns a dictionary containing all keys/values of the instance
+
+        With raw_dates, created_at and updated_at are left as datetime
+        objects for models.engine.serializer to encode.
+        """
         new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+        if not raw_dates:
+            if "created_at" in new_dict:
+                new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            if "updated_at" in new_dict:
+                new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
+            state = new_dict.pop("_sa_instance_state")
+            # loaded relationships are objects, not attributes
+            for name in state.mapper.relationships.keys():
+                new_dict.pop(name, None)
         return new_dict
 
     def delete(self):
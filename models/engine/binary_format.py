@@ -0,0 +1,299 @@
+#!/usr/bin/python3
+"""
+Contains the binary snapshot format of FileStorage
+
+A snapshot is a header followed by one block per class. Each block stores
+its rows column by column:
+
+    snapshot := b"HBNB" version:u8 class_count:u32 block*
+    block    := name:str row_count:u32 column_count:u32 column*
+    column   := name:str kind:u8 size:u32 data
+
+    KIND_UUID    row_count 16 byte uuids
+    KIND_TIME    row_count i64 microseconds since 1970-01-01
+    KIND_TAGGED  (row_count + 1) u32 offsets into the values that follow,
+                 each value being a u8 tag and its payload
+
+All integers are little endian and str is a u16 length and UTF-8 bytes.
+Every column can be decoded on its own and every value can be reached in
+O(1) from its row number, so a snapshot can be loaded with a single read
+or used in place from a memory map.
+
+Usage: python3 -m models.engine.binary_format <source> <destination>
+converts a store between the .json, .jsonl and .bin formats, picked from
+the file extensions.
+"""
+
+from datetime import datetime, timedelta
+from models.engine import serializer
+import struct
+import sys
+import uuid
+
+MAGIC = b"HBNB"
+VERSION = 1
+
+KIND_UUID = 1
+KIND_TIME = 2
+KIND_TAGGED = 3
+
+TAG_MISSING = 0
+TAG_NONE = 1
+TAG_FALSE = 2
+TAG_TRUE = 3
+TAG_INT = 4
+TAG_FLOAT = 5
+TAG_STR = 6
+TAG_JSON = 7
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# i64 stored for a missing timestamp
+NO_TIME = -2 ** 63
+
+_u8 = struct.Struct("<B")
+_u16 = struct.Struct("<H")
+_u32 = struct.Struct("<I")
+_i64 = struct.Struct("<q")
+_f64 = struct.Struct("<d")
+# value of an attribute a row does not have
+MISSING = object()
+
+
+def _pack_str(s):
+    """return s as a u16 length and its UTF-8 bytes"""
+    b = s.encode("utf-8")
+    return _u16.pack(len(b)) + b
+
+
+def _unpack_str(buf, pos):
+    """return the str at pos in buf and the position after it"""
+    n = _u16.unpack_from(buf, pos)[0]
+    pos += 2
+    return str(buf[pos:pos + n], "utf-8"), pos + n
+
+
+def _is_uuid(value):
+    """True if value is a canonical uuid string"""
+    try:
+        return str(uuid.UUID(value)) == value
+    except (TypeError, ValueError, AttributeError):
+        return False
+
+
+def _pack_value(value):
+    """return the tag and payload of one value of a KIND_TAGGED column"""
+    if value is MISSING:
+        return _u8.pack(TAG_MISSING)
+    if value is None:
+        return _u8.pack(TAG_NONE)
+    if value is True or value is False:
+        return _u8.pack(TAG_TRUE if value else TAG_FALSE)
+    if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+        return _u8.pack(TAG_INT) + _i64.pack(value)
+    if type(value) is float:
+        return _u8.pack(TAG_FLOAT) + _f64.pack(value)
+    if type(value) is str:
+        b = value.encode("utf-8")
+        tag = TAG_STR
+    else:
+        b = serializer.dumpb(value)
+        tag = TAG_JSON
+    return _u8.pack(tag) + _u32.pack(len(b)) + b
+
+
+def _unpack_value(buf, pos):
+    """return the value at pos of a KIND_TAGGED column, MISSING if the
+    row has no such attribute"""
+    tag = buf[pos]
+    pos += 1
+    if tag == TAG_MISSING:
+        return MISSING
+    if tag == TAG_NONE:
+        return None
+    if tag == TAG_FALSE or tag == TAG_TRUE:
+        return tag == TAG_TRUE
+    if tag == TAG_INT:
+        return _i64.unpack_from(buf, pos)[0]
+    if tag == TAG_FLOAT:
+        return _f64.unpack_from(buf, pos)[0]
+    n = _u32.unpack_from(buf, pos)[0]
+    raw = buf[pos + 4:pos + 4 + n]
+    if tag == TAG_STR:
+        return str(raw, "utf-8")
+    return serializer.loads(bytes(raw))
+
+
+def _pack_column(values):
+    """return the kind and data of a column holding values"""
+    if all(_is_uuid(v) for v in values):
+        return KIND_UUID, b"".join(uuid.UUID(v).bytes for v in values)
+    if all(v is MISSING or type(v) is datetime for v in values):
+        return KIND_TIME, b"".join(
+            _i64.pack(NO_TIME if v is MISSING else
+                      (v - EPOCH) // MICROSECOND) for v in values)
+    offsets = [0]
+    parts = []
+    for v in values:
+        parts.append(_pack_value(v))
+        offsets.append(offsets[-1] + len(parts[-1]))
+    return KIND_TAGGED, (struct.pack("<%dI" % len(offsets), *offsets) +
+                         b"".join(parts))
+
+
+def dumps(records):
+    """return the snapshot of records, an iterable of to_dict() style
+    dictionaries whose created_at and updated_at may be datetimes"""
+    by_class = {}
+    for record in records:
+        by_class.setdefault(record["__class__"], []).append(record)
+    out = [MAGIC, _u8.pack(VERSION), _u32.pack(len(by_class))]
+    for name, rows in by_class.items():
+        columns = {}
+        for row in rows:
+            for attr in row:
+                if attr != "__class__":
+                    columns.setdefault(attr, None)
+        out += [_pack_str(name), _u32.pack(len(rows)),
+                _u32.pack(len(columns))]
+        for attr in columns:
+            kind, data = _pack_column([row.get(attr, MISSING)
+                                       for row in rows])
+            out += [_pack_str(attr), _u8.pack(kind), _u32.pack(len(data)),
+                    data]
+    return b"".join(out)
+
+
+class Column:
+    """one column of a snapshot, read in place from its buffer"""
+
+    def __init__(self, buf, name, kind, start, rows):
+        """remember where the column lives in buf"""
+        self.buf = buf
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.rows = rows
+
+    def __getitem__(self, row):
+        """return the value of row, MISSING if the row does not have it"""
+        if self.kind == KIND_UUID:
+            pos = self.start + 16 * row
+            return str(uuid.UUID(bytes=bytes(self.buf[pos:pos + 16])))
+        if self.kind == KIND_TIME:
+            us = _i64.unpack_from(self.buf, self.start + 8 * row)[0]
+            if us == NO_TIME:
+                return MISSING
+            return EPOCH + us * MICROSECOND
+        offset = _u32.unpack_from(self.buf, self.start + 4 * row)[0]
+        return _unpack_value(self.buf,
+                             self.start + 4 * (self.rows + 1) + offset)
+
+
+class Block:
+    """the rows of one class in a snapshot"""
+
+    def __init__(self, name, rows, columns):
+        """remember the class name, row count and Column objects"""
+        self.name = name
+        self.rows = rows
+        self.columns = columns
+        self.by_name = {column.name: column for column in columns}
+
+    def record(self, row):
+        """return row as a to_dict() style dictionary with datetimes"""
+        record = {}
+        for column in self.columns:
+            value = column[row]
+            if value is not MISSING:
+                record[column.name] = value
+        record["__class__"] = self.name
+        return record
+
+    def column(self, name):
+        """return the Column called name, None if there is none"""
+        return self.by_name.get(name)
+
+
+def blocks(buf):
+    """return the list of Block objects of the snapshot in buf, a bytes
+    object or a memory map, without decoding any value"""
+    buf = memoryview(buf)
+    if bytes(buf[:4]) != MAGIC or buf[4] != VERSION:
+        raise ValueError("not a HBNB snapshot")
+    count = _u32.unpack_from(buf, 5)[0]
+    pos = 9
+    result = []
+    for i in range(count):
+        name, pos = _unpack_str(buf, pos)
+        rows, ncols = struct.unpack_from("<II", buf, pos)
+        pos += 8
+        columns = []
+        for j in range(ncols):
+            attr, pos = _unpack_str(buf, pos)
+            kind = buf[pos]
+            size = _u32.unpack_from(buf, pos + 1)[0]
+            columns.append(Column(buf, attr, kind, pos + 5, rows))
+            pos += 5 + size
+        result.append(Block(name, rows, columns))
+    return result
+
+
+def loads(buf):
+    """yield the records of the snapshot in buf one at a time"""
+    for block in blocks(buf):
+        for row in range(block.rows):
+            yield block.record(row)
+
+
+def read(path):
+    """yield the records of the store at path, whatever its format, with
+    created_at and updated_at as datetimes"""
+    if path.endswith(".bin"):
+        with open(path, "rb") as f:
+            yield from loads(f.read())
+        return
+    with open(path, "rb") as f:
+        if path.endswith(".jsonl"):
+            records = (serializer.loads(line) for line in f if line.strip())
+        else:
+            records = serializer.loads(f.read()).values()
+        for record in records:
+            for attr in ("created_at", "updated_at"):
+                if type(record.get(attr)) is str:
+                    record[attr] = datetime.fromisoformat(record[attr])
+            yield record
+
+
+def write(path, records):
+    """write records, an iterable read one record at a time except for a
+    .bin snapshot, which groups them by class, to the store at path, in
+    the format of its extension"""
+    with open(path, "wb") as f:
+        if path.endswith(".bin"):
+            f.write(dumps(records))
+        elif path.endswith(".jsonl"):
+            for record in records:
+                f.write(serializer.dumpb(record) + b"\n")
+        else:
+            sep = b"{"
+            for record in records:
+                key = record["__class__"] + "." + record["id"]
+                f.write(sep + serializer.dumpb(key) + b": " +
+                        serializer.dumpb(record))
+                sep = b", "
+            f.write(b"}" if sep == b", " else b"{}")
+
+
+def convert(src, dst):
+    """convert the store at src to the format of dst, streaming the
+    records from one to the other"""
+    write(dst, read(src))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 -m models.engine.binary_format "
+              "<source> <destination>")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+"""
+Contains the compact variants of the models built by FileStorage
+
+compact(cls) returns a subclass of cls whose instances keep their
+attributes in __slots__ instead of a __dict__: uuids, the id and the
+foreign keys, as 16 bytes, created_at and updated_at as integer
+microseconds since 1970-01-01. The public types are only rebuilt when an
+attribute is read, and to_dict() and __str__ give the same output as for
+an instance of cls.
+"""
+
+from datetime import datetime, timedelta
+import models
+from models.base_model import time
+import uuid
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# attributes every model has
+BASE_FIELDS = ("id", "created_at", "updated_at")
+# default of the attributes the model class does not define
+NO_DEFAULT = object()
+
+# (attribute names in setting order, new name): the same tuple with name
+# appended, so instances set in the same order share their tuple
+_orders = {}
+# model class: its compact subclass
+_compact_classes = {}
+
+
+def _append(order, name):
+    """return the interned tuple of order followed by name"""
+    result = _orders.get((order, name))
+    if result is None:
+        result = _orders[(order, name)] = order + (name,)
+    return result
+
+
+def _encode(value):
+    """return the compact form of value"""
+    if type(value) is datetime and value.tzinfo is None:
+        return (value - EPOCH) // MICROSECOND
+    if type(value) is str and len(value) == 36:
+        try:
+            uid = uuid.UUID(value)
+        except ValueError:
+            return value
+        if str(uid) == value:
+            return uid.bytes
+    return value
+
+
+def _decode(value, is_time):
+    """return the public form of value; is_time tells an integer is a
+    timestamp"""
+    if type(value) is bytes and len(value) == 16:
+        return str(uuid.UUID(bytes=value))
+    if is_time and type(value) is int:
+        return EPOCH + value * MICROSECOND
+    return value
+
+
+class Field:
+    """attribute of a compact model stored in a slot in compact form"""
+
+    def __init__(self, name, slot, default):
+        """name is the attribute, slot the member descriptor storing it
+        and default the value of the attribute of the model class"""
+        self.name = name
+        self.slot = slot
+        self.default = default
+        self.is_time = name in ("created_at", "updated_at")
+
+    def __get__(self, obj, cls=None):
+        """return the value of the attribute, in its public form"""
+        if obj is None:
+            return self
+        try:
+            return _decode(self.slot.__get__(obj, cls), self.is_time)
+        except AttributeError:
+            if self.default is NO_DEFAULT:
+                raise AttributeError(self.name) from None
+            return self.default
+
+    def __set__(self, obj, value):
+        """store value in compact form"""
+        try:
+            self.slot.__get__(obj, type(obj))
+        except AttributeError:
+            object.__setattr__(obj, "_order", _append(obj._order, self.name))
+        self.slot.__set__(obj, _encode(value))
+
+    def __delete__(self, obj):
+        """remove the attribute"""
+        self.slot.__delete__(obj)
+        object.__setattr__(obj, "_order", tuple(
+            name for name in obj._order if name != self.name))
+
+
+class CompactModel:
+    """methods shared by the compact subclasses of the models"""
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        """initializes the compact model like its model class"""
+        object.__setattr__(self, "_order", ())
+        object.__setattr__(self, "_extra", None)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def from_record(cls, record):
+        """build an instance from a trusted record written by the storage,
+        without the checks and the setattr() calls of __init__"""
+        obj = cls.__new__(cls)
+        object.__setattr__(obj, "_order", ())
+        object.__setattr__(obj, "_extra", None)
+        for name, value in record.items():
+            if name == "__class__":
+                continue
+            if type(value) is str and name in ("created_at", "updated_at"):
+                value = datetime.fromisoformat(value)
+            if isinstance(getattr(cls, name, None), Field):
+                object.__setattr__(obj, name, value)
+            else:
+                if obj._extra is None:
+                    object.__setattr__(obj, "_extra", {})
+                object.__setattr__(obj, "_order", _append(obj._order, name))
+                obj._extra[name] = value
+        return obj
+
+    def __setattr__(self, name, value):
+        """sets an attribute and reports the change to the storage"""
+        if isinstance(getattr(type(self), name, None), (Field, property)):
+            object.__setattr__(self, name, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            if name not in self._extra:
+                object.__setattr__(self, "_order",
+                                   _append(self._order, name))
+            self._extra[name] = value
+        storage = getattr(models, "storage", None)
+        if storage is not None:
+            storage.touch(self, name)
+
+    def __getattr__(self, name):
+        """return the attribute name that has no slot"""
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(name)
+
+    def __delattr__(self, name):
+        """remove an attribute"""
+        if isinstance(getattr(type(self), name, None), Field):
+            object.__delattr__(self, name)
+        elif self._extra is not None and name in self._extra:
+            del self._extra[name]
+            object.__setattr__(self, "_order", tuple(
+                n for n in self._order if n != name))
+        else:
+            raise AttributeError(name)
+
+    def __attributes(self):
+        """return the dictionary the instance would have as __dict__"""
+        return {name: getattr(self, name) for name in self._order}
+
+    def __str__(self):
+        """String representation of the model"""
+        return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
+                                         self.__attributes())
+
+    def to_dict(self, raw_dates=False):
+        """returns a dictionary containing all keys/values of the instance,
+        like the model class does"""
+        new_dict = self.__attributes()
+        if not raw_dates:
+            for name in ("created_at", "updated_at"):
+                if name in new_dict:
+                    new_dict[name] = new_dict[name].strftime(time)
+        new_dict["__class__"] = self.__class__.__name__
+        return new_dict
+
+
+def compact(cls):
+    """return the compact subclass of model class cls"""
+    compact_cls = _compact_classes.get(cls)
+    if compact_cls is not None:
+        return compact_cls
+    fields = list(BASE_FIELDS)
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and name not in fields and \
+                    isinstance(value, (str, int, float, list)):
+                fields.append(name)
+    slots = ["_order", "_extra"] + ["_c_" + name for name in fields]
+    compact_cls = type(cls.__name__, (CompactModel, cls),
+                       {"__slots__": tuple(slots),
+                        "__qualname__": cls.__qualname__,
+                        "__module__": cls.__module__,
+                        "__doc__": cls.__doc__})
+    for name in fields:
+        setattr(compact_cls, name,
+                Field(name, vars(compact_cls)["_c_" + name],
+                      getattr(cls, name, NO_DEFAULT)))
+    _compact_classes[cls] = compact_cls
+    return compact_cls
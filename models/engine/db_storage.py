@@ -1,45 +1,224 @@
 #!/usr/bin/python3
 """
 Contains the class DBStorage
+
+The database is the SQLAlchemy URL HBNB_DB_URL, like sqlite:///hbnb.db or
+sqlite:// for an in-memory database, or else the MySQL database of the
+HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST and HBNB_MYSQL_DB
+variables. SQLite connections run the PRAGMAs of sqlite_pragmas, which
+HBNB_SQLITE_PRAGMAS overrides with "name=value,name=value".
+
+The engine's connection pool is configured by these environment variables:
+    HBNB_DB_POOL_SIZE        connections kept open (SQLAlchemy default: 5)
+    HBNB_DB_MAX_OVERFLOW     extra connections opened under load (10)
+    HBNB_DB_POOL_TIMEOUT     seconds to wait for a free connection (30)
+    HBNB_DB_POOL_RECYCLE     seconds after which a connection is replaced,
+                             below the server's wait_timeout (3600)
+    HBNB_DB_POOL_PRE_PING    test connections before using them (1)
+    HBNB_DB_POOL_USE_LIFO    reuse the most recently returned connection
+    HBNB_DB_CONNECT_TIMEOUT  seconds to wait for the server to answer, or
+                             for a locked SQLite database
+An in-memory SQLite database has a single connection shared by every
+thread, and none of these.
 """
 
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.geo_index import bounding_box, haversine
+from models.engine.query import Query
+from models.engine.pool_metrics import MeteredQueuePool, PoolMetrics
+from models.engine.query_counter import QueryCounter
+from models.engine.text_index import TextIndex, tokenize
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+import os
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from models.engine import serializer
+from sqlalchemy import create_engine, event, func, literal, or_, select
+from sqlalchemy import union_all
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import joinedload, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import weakref
+
+# operator name of a Query: method of a column building the SQL condition
+operators = {"eq": "__eq__", "ne": "__ne__", "lt": "__lt__", "le": "__le__",
+             "gt": "__gt__", "ge": "__ge__", "in": "in_"}
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# loading strategy of Query.load(): loader option building it
+loaders = {"selectin": selectinload, "joined": joinedload}
+
+# text columns searched by search(), by class name, in the order of their
+# FULLTEXT index
+text_keys = {"Place": ("name", "description"), "Review": ("text",)}
+# MySQL error of a MATCH on columns without a FULLTEXT index, which
+# create_all() does not add to tables created before it
+ER_FT_MATCHING_KEY_NOT_FOUND = 1191
+
+# create_engine() pool option: (environment variable setting it, type),
+# left to the SQLAlchemy default when the variable is not set
+pool_settings = {"pool_size": ("HBNB_DB_POOL_SIZE", int),
+                 "max_overflow": ("HBNB_DB_MAX_OVERFLOW", int),
+                 "pool_timeout": ("HBNB_DB_POOL_TIMEOUT", float)}
+
+
+# PRAGMA run on every SQLite connection: value. WAL lets readers run
+# while a write is in progress and, with synchronous=NORMAL, only syncs
+# the log at checkpoints; busy_timeout is HBNB_DB_CONNECT_TIMEOUT when set
+sqlite_pragmas = {"journal_mode": "WAL", "synchronous": "NORMAL",
+                  "foreign_keys": "ON", "busy_timeout": "5000",
+                  "cache_size": "-65536", "temp_store": "MEMORY",
+                  "mmap_size": "268435456"}
+
+
+def database_url():
+    """return the URL of the database: HBNB_DB_URL, or the MySQL database
+    of the HBNB_MYSQL_* environment variables"""
+    url = getenv("HBNB_DB_URL")
+    if url:
+        return make_url(url)
+    return URL.create("mysql+mysqldb",
+                      username=getenv("HBNB_MYSQL_USER"),
+                      password=getenv("HBNB_MYSQL_PWD"),
+                      host=getenv("HBNB_MYSQL_HOST"),
+                      database=getenv("HBNB_MYSQL_DB"))
+
+
+def is_memory(url):
+    """True if url is an in-memory SQLite database"""
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or
+        url.query.get("mode") == "memory")
+
+
+def engine_options(url=None):
+    """return the create_engine() keyword arguments of the pool for the
+    database url, from the HBNB_DB_* environment variables"""
+    if url is None:
+        url = database_url()
+    sqlite = url.get_backend_name() == "sqlite"
+    if is_memory(url):
+        # one connection, or every connection would see its own database
+        return {"poolclass": StaticPool,
+                "connect_args": {"check_same_thread": False}}
+    options = {"poolclass": MeteredQueuePool,
+               "pool_pre_ping": getenv("HBNB_DB_POOL_PRE_PING", "1") not in
+               ("0", "false", "no"),
+               "pool_recycle": int(getenv("HBNB_DB_POOL_RECYCLE", 3600)),
+               "pool_use_lifo": getenv("HBNB_DB_POOL_USE_LIFO") in
+               ("1", "true", "yes")}
+    for option, (variable, cast) in pool_settings.items():
+        value = getenv(variable)
+        if value is not None:
+            options[option] = cast(value)
+    connect_args = {"check_same_thread": False} if sqlite else {}
+    connect_timeout = getenv("HBNB_DB_CONNECT_TIMEOUT")
+    if connect_timeout is not None:
+        if sqlite:
+            connect_args["timeout"] = float(connect_timeout)
+        else:
+            connect_args["connect_timeout"] = int(connect_timeout)
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def pragmas(url=None):
+    """return the PRAGMAs to run on the SQLite connections of url"""
+    settings = dict(sqlite_pragmas)
+    if url is not None and is_memory(url):
+        del settings["journal_mode"]
+    connect_timeout = getenv("HBNB_DB_CONNECT_TIMEOUT")
+    if connect_timeout is not None:
+        # the PRAGMA replaces the timeout connect() was given
+        settings["busy_timeout"] = str(int(float(connect_timeout) * 1000))
+    for pragma in getenv("HBNB_SQLITE_PRAGMAS", "").split(","):
+        name, _, value = pragma.partition("=")
+        if name.strip():
+            settings[name.strip()] = value.strip()
+    return settings
+
+
+def set_pragmas(settings):
+    """return a connect event listener running the PRAGMAs of settings"""
+    def connect(dbapi_connection, record):
+        """run the PRAGMAs on a new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        for name, value in settings.items():
+            cursor.execute("PRAGMA {}={}".format(name, value))
+        cursor.close()
+    return connect
+
+
+# DBStorage instances still in use, whose connections a forked child
+# process must not share with its parent
+_storages = weakref.WeakSet()
+
+
+def _after_fork():
+    """reset the connections of the live storages in a forked child"""
+    for storage in list(_storages):
+        storage.after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
 
 class DBStorage:
-    """interaacts with the MySQL database"""
+    """interacts with the MySQL or SQLite database"""
     __engine = None
     __session = None
+    __queries = None
+    __pool_metrics = None
+    # set - names of the classes whose table has no FULLTEXT index
+    __no_fulltext = None
 
     def __init__(self):
         """Instantiate a DBStorage object"""
-        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
-        HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        url = database_url()
+        self.__engine = create_engine(url, **engine_options(url))
+        if url.get_backend_name() == "sqlite":
+            event.listen(self.__engine, "connect",
+                         set_pragmas(pragmas(url)))
+        self.__pool_metrics = PoolMetrics()
+        self.__pool_metrics.attach(self.__engine)
+        self.__no_fulltext = set()
+        _storages.add(self)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
+    def after_fork(self):
+        """drop the connections inherited from the parent process without
+        closing them, since the parent still uses them"""
+        self.__engine.dispose(close=False)
+        if self.__session is not None:
+            self.__session.registry.clear()
+        self.__pool_metrics.reset()
+
+    def pool_stats(self):
+        """return the checkout and wait statistics of the connection pool,
+        with the current state of the pool"""
+        stats = self.__pool_metrics.stats()
+        stats["status"] = self.__engine.pool.status()
+        return stats
+
+    def iter(self, cls, batch_size=1000):
+        """return an iterator over the objects of cls that keeps at most
+        about batch_size rows in memory"""
+        return self.query(cls).iter(batch_size)
+
     def all(self, cls=None):
         """query on the current database session"""
         new_dict = {}
@@ -87,10 +266,150 @@ class DBStorage:
         If cls is None, return the count of all objects in storage.
         """
         if cls is None:
-            total = sum(len(self.all(class_type))
-                        for class_type in classes.values())
+            total = sum(self.count_many().values())
         elif cls in classes.values():
-            total = len(self.all(cls))
+            total = self.__session.query(func.count(cls.id)).scalar()
         else:
             total = 0
         return total
+
+    def count_many(self, clss=None):
+        """Return the number of objects of each class of clss, all of them
+        by default, by class name, with a single UNION ALL query"""
+        if clss is None:
+            clss = classes.values()
+        selects = [select(literal(cls.__name__), func.count(cls.id))
+                   for cls in clss]
+        if not selects:
+            return {}
+        return dict(self.__session.execute(union_all(*selects)).all())
+
+    def to_json(self, obj):
+        """return the JSON text of obj"""
+        return serializer.dumps(obj.to_dict(raw_dates=True))
+
+    def children(self, cls, fk, value):
+        """Return the list of cls objects whose foreign key fk is value"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        return self.__session.query(cls).filter(
+            getattr(cls, fk) == value).all()
+
+    def query(self, cls):
+        """return a Query on the objects of class cls"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        return Query(cls, self.__run_query, self.__count_query,
+                     self.__stream_query)
+
+    def __run_query(self, query):
+        """return the objects query selects"""
+        return self.__select(query).all()
+
+    def __stream_query(self, query, batch_size):
+        """yield the objects query selects, fetched batch_size rows at a
+        time through a server-side cursor; the query runs when the first
+        object is read, in the session current at that time, so a
+        streamed response does not outlive the session of its view"""
+        yield from self.__select(query).yield_per(batch_size)
+
+    def __count_query(self, query):
+        """return the number of rows query selects, counted by the
+        database"""
+        return self.__select(query).count()
+
+    def __select(self, query):
+        """compile query to a SELECT with WHERE, ORDER BY, LIMIT and
+        OFFSET"""
+        cls = query.cls
+        q = self.__session.query(cls)
+        for path, strategy in query.eager:
+            q = q.options(self.__loader(cls, path, strategy))
+        for attr, op, value in query.conditions:
+            q = q.filter(getattr(getattr(cls, attr), operators[op])(value))
+        for attr, descending in query.ordering:
+            column = getattr(cls, attr)
+            q = q.order_by(column.desc() if descending else column.asc())
+        if query.limit_count is not None:
+            q = q.limit(query.limit_count)
+        if query.offset_count:
+            q = q.offset(query.offset_count)
+        return q
+
+    @staticmethod
+    def __loader(cls, path, strategy):
+        """return the loader option loading the relationships of the dotted
+        path from cls with strategy"""
+        option = None
+        for name in path.split("."):
+            attr = getattr(cls, name)
+            if option is None:
+                option = loaders[strategy](attr)
+            else:
+                option = getattr(option, strategy + "load")(attr)
+            cls = attr.property.mapper.class_
+        return option
+
+    def queries(self):
+        """return the QueryCounter counting the statements of the engine"""
+        if self.__queries is None:
+            self.__queries = QueryCounter()
+            self.__queries.attach(self.__engine)
+        return self.__queries
+
+    def nearby(self, cls, lat, lon, radius_km, limit=None):
+        """return the list of (object, distance in km) of the cls objects
+        within radius_km of lat, lon, nearest first; the database selects
+        the rows in the bounding box of the circle"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        south, west, north, east = bounding_box(lat, lon, radius_km)
+        q = self.__session.query(cls).filter(cls.latitude.between(south,
+                                                                  north))
+        if west <= east:
+            q = q.filter(cls.longitude.between(west, east))
+        else:
+            q = q.filter(or_(cls.longitude >= west, cls.longitude <= east))
+        found = []
+        for obj in q.all():
+            distance = haversine(lat, lon, obj.latitude, obj.longitude)
+            if distance <= radius_km:
+                found.append((obj, distance))
+        found.sort(key=lambda item: item[1])
+        return found[:limit]
+
+    def search(self, cls, q, limit=None):
+        """return the list of (object, score) of the cls objects whose text
+        columns contain words of q, best score first; MySQL ranks them
+        with its FULLTEXT index, other databases, and MySQL tables missing
+        the index, select them with LIKE and they are ranked with BM25"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        columns = [getattr(cls, attr) for attr in text_keys[cls.__name__]]
+        if self.__engine.dialect.name == "mysql" and \
+                cls.__name__ not in self.__no_fulltext:
+            score = match(*columns, against=q).in_natural_language_mode()
+            try:
+                rows = self.__session.query(cls, score) \
+                    .filter(score > 0).order_by(score.desc()) \
+                    .limit(limit).all()
+            except sqlalchemy.exc.OperationalError as error:
+                if getattr(error.orig, "args", ())[:1] != \
+                        (ER_FT_MATCHING_KEY_NOT_FOUND,):
+                    raise
+                self.__no_fulltext.add(cls.__name__)
+            else:
+                return [(obj, float(rank)) for obj, rank in rows]
+        tokens = set(tokenize(q))
+        if not tokens:
+            return []
+        rows = self.__session.query(cls).filter(or_(
+            *[column.ilike("%" + token + "%")
+              for column in columns for token in tokens])).all()
+        index = TextIndex()
+        by_id = {}
+        for obj in rows:
+            by_id[obj.id] = obj
+            index.add(obj.id, " ".join(getattr(obj, column.key) or ""
+                                       for column in columns))
+        return [(by_id[key], score) for score, key in index.search(q, limit)]
@@ -3,79 +3,1037 @@
 Contains the FileStorage class
 """
 
-import json
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import logging
+import mmap
+import os
+from os import getenv
+import threading
+import time
+from types import MappingProxyType
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine import binary_format, serializer
+from models.engine.compact import compact
+from models.engine.geo_index import GeoIndex
+from models.engine.lazy_objects import LazyObjects
+from models.engine.query import Query
+from models.engine.sorted_index import SortedIndex
+from models.engine.text_index import TextIndex, tokenize
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks, one process per store
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# foreign key attributes indexed for children(), by class name
+foreign_keys = {"Amenity": ("place_id",), "City": ("state_id",),
+                "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+
+# numeric attributes kept in a SortedIndex for range queries, by class name
+range_keys = {"Place": ("price_by_night", "number_rooms", "max_guest",
+                        "number_bathrooms")}
+
+# (latitude, longitude) attributes kept in a GeoIndex, by class name
+geo_keys = {"Place": ("latitude", "longitude")}
+
+# text attributes kept in a TextIndex for search(), by class name
+text_keys = {"Place": ("name", "description"), "Review": ("text",)}
+
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
-    # string - path to the JSON file
-    __file_path = "file.json"
+    # string - path to the JSON file; with a .jsonl extension the file
+    # holds one object per line and is loaded one line at a time, with a
+    # .bin extension it is a models.engine.binary_format snapshot. A path
+    # ending with "/" is a directory holding one file, or shard, per class
+    __file_path = getenv("HBNB_FILE_PATH", "file.json")
+    # string - "json", "jsonl" or "bin" to ignore the extension; the
+    # format of the shards, "json" by default
+    __file_format = getenv("HBNB_FILE_FORMAT")
+    # boolean - append mutations to a journal next to the snapshot
+    # instead of rewriting it on every save()
+    __journal = getenv("HBNB_FILE_JOURNAL") in ("1", "true", "yes")
+    # boolean - with a .bin file, memory map the snapshot and only build
+    # the objects that are looked up, keeping at most __lazy_cache of them
+    # that have not changed; saves then always go through the journal
+    __lazy = getenv("HBNB_FILE_LAZY") in ("1", "true", "yes")
+    __lazy_cache = int(getenv("HBNB_FILE_LAZY_CACHE", 10000))
+    # boolean - build the objects read from disk as the compact __slots__
+    # subclasses of models.engine.compact, which use less memory
+    __compact = getenv("HBNB_FILE_COMPACT") in ("1", "true", "yes")
+    # boolean - keep a TextIndex of the texts in memory for search(),
+    # built by the first search; without it every search scans the texts
+    __text_indexed = getenv("HBNB_FILE_TEXT_INDEX", "1") not in \
+        ("0", "false", "no")
+    # integer - journal size in bytes that triggers a compaction
+    __journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", 4 * 1024 * 1024))
+    # string - "durable" writes to disk before save() returns, "group"
+    # leaves it to a background thread that merges the saves requested
+    # within __commit_window seconds into a single write
+    __commit = getenv("HBNB_FILE_COMMIT", "durable")
+    __commit_window = float(getenv("HBNB_FILE_COMMIT_WINDOW", 0.05))
+    # lock held by everything that reads or changes the state below
+    __lock = threading.RLock()
+    __save_requested = threading.Condition(__lock)
+    # file descriptor of the lock file while this process holds the
+    # advisory lock shared between the processes using the store, and how
+    # many nested __locked() hold it
+    __lock_fd = None
+    __lock_depth = 0
+    __unflushed_save = False
+    __flusher = None
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __by_class = {}
+    # dictionary - <class name>: (generation, read-only view of the
+    # partition of that generation handed to readers). None: (0, read-only
+    # copy of every object), dropped by every write
+    __views = {}
+    # dictionary - <class name>: generation of its partition, bumped when
+    # a write copies the partition because a view of it was handed out
+    __generations = {}
+    # dictionary - <class name>: {<fk>: {<fk value>: {<key>: None}}}
+    __fk_index = {}
+    # dictionary - <class name>.id: {<fk>: <fk value when indexed>}
+    __fk_values = {}
+    # dictionary - <class name>: {<attribute>: SortedIndex}, None until
+    # the first range query builds it from every object at once
+    __range_index = None
+    # dictionary - <class name>.id: {<attribute>: <value when indexed>}
+    __range_values = {}
+    # dictionary - <class name>: GeoIndex, None until the first nearby()
+    __geo_index = None
+    # dictionary - <class name>: TextIndex, None until the first search()
+    __text_index = None
+    # the __objects dictionary the partitions and indexes were built from,
+    # and its size at that time
+    __indexed = None
+    __indexed_len = 0
+    # set - <class name>.id of every object added, changed or deleted
+    # since the last save()
+    __pending = set()
+    # boolean - the next save() has to write a full snapshot
+    __full_save = True
+    # set - <class name> of the shards out of date with the objects
+    __stale_shards = set()
+    # dictionary - path: (mtime, size, inode) of the snapshot files and of
+    # the journal when they were last read or written by this process, and
+    # the version counter of the lock file, bumped by every write
+    __disk_stamp = None
+    # dictionary - <class name>.id: JSON text of the object when it was
+    # last written, dropped as soon as the object changes. Not kept in
+    # compact mode, nor for the objects a lazy store only has in its cache
+    __fragments = {}
 
     def all(self, cls=None):
-        """returns the dictionary __objects"""
+        """returns the dictionary __objects, or a read-only point-in-time
+        view of the objects of class cls that later writes do not change"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            return self.__view(cls if isinstance(cls, str) else cls.__name__)
         return self.__objects
 
+    def snapshot(self):
+        """return a read-only point-in-time view of every object, safe to
+        iterate while other threads keep writing"""
+        return self.__view(None)
+
+    def __view(self, name):
+        """return the read-only copy of partition name, or of every object
+        if name is None, copying it only if it changed since last time"""
+        if self.__indexed is self.__objects and \
+                self.__indexed_len == len(self.__objects):
+            cached = self.__views.get(name)
+            if cached is not None:
+                return cached[1]
+        with self.__lock:
+            self.__check_index()
+            if isinstance(self.__objects, LazyObjects):
+                return self.__objects.partition(name)
+            cached = self.__views.get(name)
+            if cached is None:
+                if name is None:
+                    cached = (0, MappingProxyType(dict(self.__objects)))
+                else:
+                    cached = (self.__generations.get(name, 0),
+                              MappingProxyType(self.__partition(name)))
+                self.__views[name] = cached
+            return cached[1]
+
+    def __partition(self, name):
+        """return the partition of class name to change, first copied as
+        a new generation if a view of the current one was handed out, so
+        views never change"""
+        partition = self.__by_class.get(name)
+        if partition is None:
+            partition = self.__by_class[name] = {}
+            return partition
+        cached = self.__views.get(name)
+        generation = self.__generations.get(name, 0)
+        if cached is not None and cached[0] == generation:
+            del self.__views[name]
+            self.__generations[name] = generation + 1
+            partition = self.__by_class[name] = dict(partition)
+        return partition
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock:
+                self.__check_index()
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__objects[key] = obj
+                self.__index(key, obj)
+                FileStorage.__indexed_len = len(self.__objects)
+                self.__pending.add(key)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
+
+        In group commit mode this only wakes up the background flusher;
+        call flush() when the data has to be on disk.
+        """
+        if self.__commit != "group":
+            self.flush()
+            return
+        with self.__save_requested:
+            if self.__flusher is None or not self.__flusher.is_alive():
+                if self.__flusher is None:
+                    atexit.register(self.flush)
+                FileStorage.__flusher = threading.Thread(
+                    target=self.__flush_loop, daemon=True)
+                self.__flusher.start()
+            FileStorage.__unflushed_save = True
+            self.__save_requested.notify()
+
+    def flush(self):
+        """write every change made so far to disk before returning
+
+        In journal mode only the changes since the last flush are appended
+        to the journal, which is folded into a new snapshot once it grows
+        past __journal_max bytes. The changes other processes wrote since
+        this one last read the store are merged in first.
+        """
+        with self.__lock:
+            FileStorage.__unflushed_save = False
+            self.__check_index()
+            if not self.__pending and not self.__full_save:
+                return
+            with self.__locked(exclusive=True):
+                if not self.__full_save and self.changed_on_disk():
+                    self.__reload(adopt=True, full=False)
+                self.__stale_shards.update(key.split(".", 1)[0]
+                                           for key in self.__pending)
+                self.__flush()
+                self.__bump_version()
+                FileStorage.__disk_stamp = self.__stamp()
+
+    def __flush(self):
+        """write the pending changes, as a snapshot or to the journal"""
+        journal = self.__journal or \
+            isinstance(self.__objects, LazyObjects)
+        if not journal or self.__full_save:
+            self.__write_snapshot()
+            return
+        self.__trim_journal()
+        with open(self.__log_path(), 'a') as f:
+            for key in self.__pending:
+                obj = self.__objects.get(key)
+                if obj is None:
+                    f.write('{"op": "delete", "key": %s}\n' %
+                            serializer.dumps(key))
+                else:
+                    f.write('{"op": "upsert", "key": %s, "value": %s}\n'
+                            % (serializer.dumps(key),
+                               self.__fragment(key, obj)))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        self.__pending.clear()
+        if size > self.__journal_max:
+            self.__write_snapshot()
+
+    def __trim_journal(self):
+        """cut the torn last line an interrupted append left at the end of
+        the journal, so the next entries start on a line of their own"""
+        try:
+            f = open(self.__log_path(), 'rb+')
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline >= 0:
+                    pos = start + newline + 1
+                    break
+                pos = start
+            f.truncate(pos)
+            f.flush()
+            os.fsync(f.fileno())
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file, then replays its journal, to
+        __objects
+
+        Nothing is read when the files are the ones this process last read
+        or wrote, so calling this after every request is cheap.
+        """
+        with self.__lock:
+            rebuilt = self.__check_index()
+            if rebuilt or self.changed_on_disk():
+                # nothing in memory that is not on disk: the next save can
+                # merge with the other processes instead of overwriting
+                loaded_only = rebuilt and not self.__objects
+                with self.__locked(exclusive=False):
+                    self.__reload(full=rebuilt)
+                if loaded_only:
+                    FileStorage.__full_save = False
+
+    def changed_on_disk(self):
+        """True if the JSON file or its journal was written by someone else
+        since this process last read or wrote them"""
+        return self.__stamp() != self.__disk_stamp
+
+    def version(self):
+        """return the version counter of the store, bumped by every write
+        of every process using it"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            with open(self.__lock_path(), 'rb') as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def __reload(self, adopt=False, full=True):
+        """read the JSON file and its journal; adopt keeps the objects a
+        lazy store already built. Unless full, only the shards that changed
+        are read and they replace the objects without pending changes"""
+        stamp = self.__stamp()
+        if self.__sharded():
+            old = self.__disk_stamp or {}
+            names = self.__shard_names(
+                path for path in set(stamp) | set(old)
+                if full or old.get(path) != stamp.get(path))
+            self.__load_shards(names, full)
+        elif self.__is_lazy():
+            self.__map_snapshot(adopt)
+        else:
+            self.__merge(list(self.__objects), self.__read(self.__file_path),
+                         full)
+        self.__replay_journal()
+        FileStorage.__indexed_len = len(self.__objects)
+        FileStorage.__disk_stamp = stamp
+
+    def __read(self, path):
+        """return the list of (key, object) stored in the file at path"""
+        file_format = self.__format()
+        result = []
+        try:
+            with open(path, 'rb') as f:
+                if file_format == "bin":
+                    records = binary_format.loads(f.read())
+                elif file_format == "jsonl":
+                    records = self.__read_lines(f, path)
+                else:
+                    records = serializer.loads(f.read()).values()
+                for record in records:
+                    result.append((record["__class__"] + "." + record["id"],
+                                   self.__hydrate(record)))
+        except FileNotFoundError:
+            pass
         except ValueError:
+            # an empty or unreadable snapshot reads as an empty store, but
+            # a broken line in the middle of a .jsonl file is lost data
+            if file_format == "jsonl":
+                raise
+        return result
+
+    @staticmethod
+    def __read_lines(f, path):
+        """yield the records of the .jsonl file f, skipping blank lines
+        and a torn last line left by an interrupted write"""
+        torn = None
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            if torn is not None:
+                raise ValueError("{}: line {} is not valid JSON"
+                                 .format(path, torn))
+            try:
+                record = serializer.loads(line)
+            except ValueError:
+                torn = number
+                continue
+            yield record
+
+    def __load_shards(self, names, full):
+        """read the shards of classes names in parallel and merge them"""
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            shards = list(pool.map(self.__read, map(self.__shard_path,
+                                                    names)))
+        for name, shard in zip(names, shards):
+            self.__merge(list(self.__by_class.get(name, {})), shard, full)
+
+    def __merge(self, keys, loaded, full):
+        """store the (key, object) pairs loaded from disk; unless full, the
+        keys no longer on disk are removed and the pending changes win"""
+        if not full:
+            on_disk = {key for key, obj in loaded}
+            for key in keys:
+                if key not in on_disk and key not in self.__pending:
+                    del self.__objects[key]
+                    self.__unindex(key)
+        for key, obj in loaded:
+            if full or key not in self.__pending:
+                self.__objects[key] = obj
+                self.__index(key, obj)
+
+    def __map_snapshot(self, adopt):
+        """replace __objects by a LazyObjects over the memory mapped
+        snapshot, keeping the changes that were not saved yet"""
+        old = self.__objects
+        buf = None
+        try:
+            with open(self.__file_path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            pass
+        objects = LazyObjects(buf, self.__hydrate, self.__lazy_cache)
+        if adopt and isinstance(old, LazyObjects):
+            objects.adopt(old)
+        for key in self.__pending:
+            if key in old:
+                objects[key] = old[key]
+            elif key in objects:
+                del objects[key]
+        pending = set(self.__pending)
+        FileStorage.__objects = objects
+        self.__check_index()
+        self.__pending.update(pending)
+        FileStorage.__full_save = False
+
+    def __replay_journal(self):
+        """apply the journal to __objects; like in __merge(), the pending
+        changes of this process win over the journal"""
+        try:
+            with open(self.__log_path(), 'r') as f:
+                for entry in self.__read_lines(f, self.__log_path()):
+                    if entry["key"] in self.__pending:
+                        continue
+                    if entry["op"] == "upsert":
+                        self.__load(entry["key"], entry["value"])
+                    elif entry["key"] in self.__objects:
+                        del self.__objects[entry["key"]]
+                        self.__unindex(entry["key"])
+        except FileNotFoundError:
             pass
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
-            key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock:
+                self.__check_index()
+                key = obj.__class__.__name__ + '.' + obj.id
+                if key in self.__objects:
+                    del self.__objects[key]
+                    self.__unindex(key)
+                    FileStorage.__indexed_len = len(self.__objects)
+                    self.__pending.add(key)
+
+    def touch(self, obj, name=None):
+        """record that attribute name of obj was just set"""
+        key = "{}.{}".format(obj.__class__.__name__,
+                             getattr(obj, "id", None))
+        lazy = isinstance(self.__objects, LazyObjects)
+        if lazy:
+            # objects being built from the snapshot are not stored yet
+            stored = self.__objects.loaded(key)
+        else:
+            stored = self.__objects.get(key)
+        if stored is not obj:
+            return
+        with self.__lock:
+            if lazy:
+                # keep it in memory until it is written
+                self.__objects[key] = obj
+            self.__fragments.pop(key, None)
+            self.__pending.add(key)
+            cls_name = obj.__class__.__name__
+            if name in foreign_keys.get(cls_name, ()) or \
+                    name in range_keys.get(cls_name, ()) or \
+                    name in geo_keys.get(cls_name, ()) or \
+                    name in text_keys.get(cls_name, ()):
+                self.__index(key, obj)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
+        """call reload() method for deserializing the JSON file to objects,
+        which only reads it if another process changed it"""
         self.reload()
 
     def get(self, cls, id):
         """Retrieve one object by class and ID"""
         if cls and id:
             key = "{}.{}".format(cls.__name__, id)
-            return self.all(cls).get(key)
+            return self.__objects.get(key)
         return None
 
     def count(self, cls=None):
         """Count the number of objects in storage matching a given class"""
-        return len(self.all(cls))
+        if cls is None:
+            return len(self.__objects)
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock:
+            self.__check_index()
+            if isinstance(self.__objects, LazyObjects):
+                return len(self.__objects.partition(name))
+            return len(self.__by_class.get(name, {}))
+
+    def count_many(self, clss=None):
+        """Return the number of objects of each class of clss, all of them
+        by default, by class name"""
+        names = [cls if isinstance(cls, str) else cls.__name__
+                 for cls in (classes if clss is None else clss)]
+        with self.__lock:
+            return {name: self.count(name) for name in names}
+
+    def children(self, cls, fk, value):
+        """Return the list of cls objects whose foreign key fk is value"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        if fk not in foreign_keys.get(name, ()):
+            return [obj for obj in self.all(name).values()
+                    if getattr(obj, fk, None) == value]
+        with self.__lock:
+            self.__check_index()
+            by_value = self.__fk_index.get(name, {}).get(fk, {})
+            return [self.__objects[key] for key in by_value.get(value, ())]
+
+    def iter(self, cls, batch_size=None):
+        """return an iterator over a point-in-time view of the objects of
+        cls; batch_size only matters to DBStorage"""
+        return iter(self.all(cls).values())
+
+    def query(self, cls):
+        """return a Query on the objects of class cls"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        return Query(cls, self.__run_query)
+
+    def __run_query(self, query):
+        """return the objects matching query, starting from the id, the
+        foreign key index or the range index when a condition allows it,
+        from every object of the class otherwise"""
+        name = query.cls.__name__
+        candidates = None
+        ranged = self.__range_query(name, query)
+        if ranged is not None:
+            candidates, ordered = ranged
+        for attr, op, value in query.conditions:
+            if op not in ("eq", "in"):
+                continue
+            # a repeated value gives its objects once, as SQL IN does
+            values = [value] if op == "eq" else dict.fromkeys(value)
+            if attr == "id":
+                ordered = False
+                candidates = [self.__objects.get(name + "." + v)
+                              for v in values]
+                candidates = [obj for obj in candidates if obj is not None]
+                break
+            if attr in foreign_keys.get(name, ()):
+                ordered = False
+                candidates = []
+                for v in values:
+                    candidates += self.children(name, attr, v)
+                break
+        if candidates is None:
+            candidates = self.all(name).values()
+        elif ordered and query.limit_count is not None:
+            # already in the requested order: stop at the last one needed
+            end = query.offset_count + query.limit_count
+            result = []
+            for obj in candidates:
+                if len(result) >= end:
+                    break
+                if query.matches(obj):
+                    result.append(obj)
+            return result[query.offset_count:]
+        return query.sort_and_slice(obj for obj in candidates
+                                    if query.matches(obj))
+
+    def __range_query(self, name, query):
+        """return the objects within the bounds query sets on a range
+        indexed attribute, and whether they are in the order query asks
+        for, or None if it sets no such bounds"""
+        bounds = {}
+        for attr, op, value in query.conditions:
+            if attr not in range_keys.get(name, ()) or \
+                    type(value) not in (int, float) or \
+                    op not in ("eq", "lt", "le", "gt", "ge"):
+                continue
+            low, high, low_inc, high_inc = bounds.get(attr, (None,) * 4)
+            if op in ("eq", "gt", "ge") and (low is None or value >= low):
+                low, low_inc = value, op != "gt"
+            if op in ("eq", "lt", "le") and (high is None or value <= high):
+                high, high_inc = value, op != "lt"
+            bounds[attr] = (low, high, low_inc, high_inc)
+        if not bounds:
+            return None
+        attr = next(iter(bounds))
+        descending = False
+        if query.ordering and query.ordering[0][0] in bounds:
+            attr, descending = query.ordering[0]
+        with self.__lock:
+            self.__check_index()
+            if self.__range_index is None:
+                self.__build_range_index()
+            index = self.__range_index.get(name, {}).get(attr)
+            keys = [] if index is None else index.range(
+                *bounds[attr], reverse=descending)
+            objs = [self.__objects[key] for key in keys]
+        return objs, query.ordering == [(attr, descending)]
+
+    def nearby(self, cls, lat, lon, radius_km, limit=None):
+        """return the list of (object, distance in km) of the cls objects
+        within radius_km of lat, lon, nearest first"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock:
+            self.__check_index()
+            if self.__geo_index is None:
+                self.__build_geo_index()
+            index = self.__geo_index.get(name)
+            found = index.within(lat, lon, radius_km) if index else []
+            return [(self.__objects[key], distance)
+                    for distance, key in found[:limit]]
+
+    def search(self, cls, q, limit=None):
+        """return the list of (object, score) of the cls objects whose text
+        attributes contain words of q, best BM25 score first; without
+        __text_indexed the texts containing a word of q are indexed for
+        this search only, and ranked among themselves"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock:
+            self.__check_index()
+            if not self.__text_indexed:
+                index = self.__scan_texts(name, q)
+            else:
+                if self.__text_index is None:
+                    self.__build_text_index()
+                index = self.__text_index.get(name)
+            found = index.search(q, limit) if index else []
+            return [(self.__objects[key], score) for score, key in found]
+
+    def __hydrate(self, record):
+        """build the object described by record"""
+        cls = classes[record["__class__"]]
+        if self.__compact:
+            cls = compact(cls)
+        return cls.from_record(record)
+
+    def __load(self, key, record):
+        """build the object described by record and store it as key"""
+        obj = self.__hydrate(record)
+        self.__objects[key] = obj
+        self.__index(key, obj)
+
+    def to_json(self, obj):
+        """return the JSON text of obj, cached until obj changes"""
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        with self.__lock:
+            if isinstance(self.__objects, LazyObjects):
+                # the objects of the cache come and go: only the new and
+                # changed ones, bound for the journal, keep their JSON
+                stored = self.__objects.live(key)
+            else:
+                stored = self.__objects.get(key)
+            if stored is obj:
+                return self.__fragment(key, obj)
+        return serializer.dumps(obj.to_dict(raw_dates=True))
+
+    def __fragment(self, key, obj):
+        """return the JSON text of obj, serializing it only if it changed"""
+        fragment = self.__fragments.get(key)
+        if fragment is None:
+            fragment = serializer.dumps(obj.to_dict(raw_dates=True))
+            if not self.__compact:
+                self.__fragments[key] = fragment
+        return fragment
+
+    def __flush_loop(self):
+        """background flusher: wait for a save, let more saves pile up for
+        __commit_window seconds, then write them all at once; a write
+        that fails is logged and retried, waiting longer every time"""
+        delay = self.__commit_window
+        while True:
+            with self.__save_requested:
+                while not self.__unflushed_save:
+                    self.__save_requested.wait()
+            time.sleep(delay)
+            try:
+                self.flush()
+                delay = self.__commit_window
+            except Exception:
+                logger.exception("could not write %s, retrying",
+                                 self.__file_path)
+                with self.__save_requested:
+                    FileStorage.__unflushed_save = True
+                delay = min(max(2 * delay, 0.1), 5.0)
+
+    def __write_snapshot(self):
+        """write every object, or every stale shard, to __file_path and
+        empty the journal"""
+        if self.__sharded():
+            os.makedirs(self.__file_path, exist_ok=True)
+            names = set(self.__stale_shards)
+            if self.__full_save:
+                names.update(self.__by_class)
+                names.update(self.__shard_names(self.__stamp()))
+            for name in names:
+                self.__write(self.__shard_path(name),
+                             self.__by_class.get(name, {}).items())
+        else:
+            self.__write(self.__file_path, ((key, self.__objects[key])
+                                            for key in self.__objects))
+        try:
+            os.remove(self.__log_path())
+        except FileNotFoundError:
+            pass
+        self.__pending.clear()
+        self.__stale_shards.clear()
+        FileStorage.__full_save = False
+        if isinstance(self.__objects, LazyObjects):
+            # the objects written only stay in the cache of the new store
+            FileStorage.__fragments = {}
+            self.__reload(adopt=True)
+
+    def __write(self, path, items):
+        """write the (key, object) pairs of items to the file at path
+        through a temporary file, so readers never see a partial file"""
+        tmp_path = path + ".tmp"
+        file_format = self.__format()
+        with open(tmp_path, 'wb' if file_format == "bin" else 'w') as f:
+            if file_format == "bin":
+                f.write(binary_format.dumps(obj.to_dict(raw_dates=True)
+                                            for key, obj in items))
+            elif file_format == "jsonl":
+                for key, obj in items:
+                    f.write(self.__fragment(key, obj) + "\n")
+            else:
+                f.write("{")
+                sep = ""
+                for key, obj in items:
+                    f.write(sep + serializer.dumps(key) + ": " +
+                            self.__fragment(key, obj))
+                    sep = ", "
+                f.write("}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def __index(self, key, obj=None):
+        """add key to its class partition and foreign key indexes; obj is
+        None for the objects of a lazy store that were not built yet"""
+        self.__unindex(key)
+        name = key.split(".", 1)[0]
+        lazy = isinstance(self.__objects, LazyObjects)
+        if not lazy:
+            self.__partition(name)[key] = obj
+        if self.__range_index is not None and name in range_keys:
+            values = self.__range_entry(key, obj)
+            by_attr = self.__range_index.setdefault(name, {})
+            for attr, value in values.items():
+                by_attr.setdefault(attr, SortedIndex()).add(value, key)
+            self.__range_values[key] = values
+        if self.__geo_index is not None and name in geo_keys:
+            point = self.__geo_point(key, obj)
+            if point is not None:
+                self.__geo_index.setdefault(name, GeoIndex()).add(key, *point)
+        if self.__text_index is not None and name in text_keys:
+            index = self.__text_index.setdefault(name, TextIndex())
+            index.add(key, self.__text(key, obj))
+        fks = foreign_keys.get(name)
+        if not fks:
+            return
+        values = {}
+        by_fk = self.__fk_index.setdefault(name, {})
+        for fk in fks:
+            if obj is None:
+                value = self.__objects.peek(key, fk)
+            else:
+                value = getattr(obj, fk, None)
+            by_fk.setdefault(fk, {}).setdefault(value, {})[key] = None
+            values[fk] = value
+        self.__fk_values[key] = values
+
+    def __members(self, name):
+        """return the (key, object) pairs of class name; the object is None
+        in a lazy store if it was not built"""
+        if isinstance(self.__objects, LazyObjects):
+            return ((key, None) for key in self.__objects.partition(name))
+        return self.__by_class.get(name, {}).items()
+
+    def __attr(self, key, obj, attr, default=None):
+        """return attribute attr of obj, read from the snapshot row of key
+        when obj is None"""
+        if obj is None:
+            return self.__objects.peek(key, attr, default)
+        return getattr(obj, attr, default)
+
+    def __range_entry(self, key, obj):
+        """return the {attribute: value} of the numeric range attributes
+        of obj, stored as key"""
+        name = key.split(".", 1)[0]
+        values = {}
+        for attr in range_keys[name]:
+            value = self.__attr(key, obj, attr,
+                                getattr(classes[name], attr, None))
+            if type(value) in (int, float):
+                values[attr] = value
+        return values
+
+    def __own_attr(self, key, obj, attr):
+        """return attribute attr set on obj, or in the snapshot row of key
+        when obj is None, and None if obj only has the class default"""
+        if obj is None:
+            obj = self.__objects.loaded(key)
+            if obj is None:
+                return self.__objects.peek(key, attr)
+        if attr in getattr(obj, "__dict__", ()) or \
+                attr in getattr(obj, "_order", ()):
+            return getattr(obj, attr)
+        return None
+
+    def __geo_point(self, key, obj):
+        """return the (latitude, longitude) set on obj, stored as key, or
+        None if it has none; the class defaults are not a location"""
+        point = tuple(self.__own_attr(key, obj, attr)
+                      for attr in geo_keys[key.split(".", 1)[0]])
+        if all(type(value) in (int, float) for value in point):
+            return point
+        return None
+
+    def __text(self, key, obj):
+        """return the text attributes of obj, stored as key, joined"""
+        texts = (self.__attr(key, obj, attr)
+                 for attr in text_keys[key.split(".", 1)[0]])
+        return " ".join(text for text in texts if isinstance(text, str))
+
+    def __build_range_index(self):
+        """build the range indexes of every object, sorting the values of
+        each attribute once"""
+        FileStorage.__range_values = {}
+        pairs = {}
+        for name in range_keys:
+            for key, obj in self.__members(name):
+                values = self.__range_entry(key, obj)
+                self.__range_values[key] = values
+                for attr, value in values.items():
+                    pairs.setdefault(name, {}).setdefault(
+                        attr, []).append((value, key))
+        FileStorage.__range_index = {
+            name: {attr: SortedIndex(values)
+                   for attr, values in by_attr.items()}
+            for name, by_attr in pairs.items()}
+
+    def __build_geo_index(self):
+        """build the geo indexes of every object"""
+        FileStorage.__geo_index = {}
+        for name in geo_keys:
+            for key, obj in self.__members(name):
+                point = self.__geo_point(key, obj)
+                if point is not None:
+                    self.__geo_index.setdefault(name, GeoIndex()).add(
+                        key, *point)
+
+    def __build_text_index(self):
+        """build the text indexes of every object"""
+        FileStorage.__text_index = {}
+        for name in text_keys:
+            index = self.__text_index[name] = TextIndex()
+            for key, obj in self.__members(name):
+                index.add(key, self.__text(key, obj))
+
+    def __scan_texts(self, name, q):
+        """return a TextIndex of the texts of the objects of class name
+        that contain a word of q, or None if it has no text attributes"""
+        if name not in text_keys:
+            return None
+        tokens = set(tokenize(q))
+        index = TextIndex()
+        for key, obj in self.__members(name):
+            text = self.__text(key, obj)
+            if not tokens.isdisjoint(tokenize(text)):
+                index.add(key, text)
+        return index
+
+    def __unindex(self, key):
+        """remove key from its class partition and foreign key indexes"""
+        name = key.split(".", 1)[0]
+        self.__fragments.pop(key, None)
+        self.__views.pop(None, None)
+        if key in self.__by_class.get(name, ()):
+            del self.__partition(name)[key]
+        if self.__geo_index and name in self.__geo_index:
+            self.__geo_index[name].remove(key)
+        if self.__text_index and name in self.__text_index:
+            self.__text_index[name].remove(key)
+        values = self.__range_values.pop(key, None)
+        if values:
+            by_attr = self.__range_index[name]
+            for attr, value in values.items():
+                by_attr[attr].remove(value, key)
+        values = self.__fk_values.pop(key, None)
+        if values is None:
+            return
+        by_fk = self.__fk_index[name]
+        for fk, value in values.items():
+            bucket = by_fk[fk][value]
+            del bucket[key]
+            if not bucket:
+                del by_fk[fk][value]
+
+    def __format(self):
+        """return the format of __file_path: json, jsonl or bin"""
+        if self.__file_format:
+            return self.__file_format
+        if self.__sharded():
+            return "json"
+        return os.path.splitext(self.__file_path)[1][1:] or "json"
+
+    def __sharded(self):
+        """True if __file_path is a directory of per-class shards"""
+        return self.__file_path.endswith("/")
+
+    def __is_lazy(self):
+        """True if the objects are built from a memory map on demand"""
+        return self.__lazy and self.__format() == "bin" and \
+            not self.__sharded()
+
+    def __shard_path(self, name):
+        """return the path of the shard of class name"""
+        return os.path.join(self.__file_path, name + "." + self.__format())
+
+    def __shard_names(self, paths):
+        """return the class names of the shards among paths"""
+        return [os.path.splitext(os.path.basename(path))[0]
+                for path in paths
+                if path not in (self.__log_path(), self.__lock_path())]
+
+    def __log_path(self):
+        """return the path of the journal"""
+        if self.__sharded():
+            return os.path.join(self.__file_path, "journal.log")
+        return self.__file_path + ".log"
+
+    def __lock_path(self):
+        """return the path of the lock file, which holds the version"""
+        if self.__sharded():
+            return os.path.join(self.__file_path, "store.lock")
+        return self.__file_path + ".lock"
+
+    @contextmanager
+    def __locked(self, exclusive):
+        """hold the advisory lock of the store, exclusive to write it or
+        shared to read it, unless this process already holds it"""
+        if fcntl is None or self.__lock_depth:
+            FileStorage.__lock_depth += 1
+            try:
+                yield
+            finally:
+                FileStorage.__lock_depth -= 1
+            return
+        if self.__sharded():
+            os.makedirs(self.__file_path, exist_ok=True)
+        fd = os.open(self.__lock_path(), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            FileStorage.__lock_fd = fd
+            FileStorage.__lock_depth = 1
+            yield
+        finally:
+            FileStorage.__lock_fd = None
+            FileStorage.__lock_depth = 0
+            os.close(fd)
+
+    def __bump_version(self):
+        """increment the version counter in the lock file"""
+        version = str(self.version() + 1).encode()
+        if self.__lock_fd is not None:
+            os.pwrite(self.__lock_fd, version, 0)
+            os.ftruncate(self.__lock_fd, len(version))
+        else:
+            with open(self.__lock_path(), 'wb') as f:
+                f.write(version)
+
+    def __stamp(self):
+        """return a dictionary of the (mtime, size, inode) of the snapshot
+        files and of the journal that exist, by path"""
+        if self.__sharded():
+            ext = "." + self.__format()
+            try:
+                paths = [entry.path for entry in os.scandir(self.__file_path)
+                         if entry.name.endswith(ext)]
+            except FileNotFoundError:
+                paths = []
+        else:
+            paths = [self.__file_path]
+        stamp = {}
+        for path in paths + [self.__log_path()]:
+            try:
+                st = os.stat(path)
+                stamp[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except FileNotFoundError:
+                pass
+        stamp[self.__lock_path()] = self.version()
+        return stamp
+
+    def __check_index(self):
+        """rebuild the partitions and indexes if __objects was replaced or
+        edited directly, and tell whether it did"""
+        if self.__indexed is not self.__objects or \
+                self.__indexed_len != len(self.__objects):
+            FileStorage.__by_class = {}
+            FileStorage.__views = {}
+            # the full save replaces the changes of the previous objects
+            FileStorage.__full_save = True
+            self.__pending.clear()
+            FileStorage.__fragments = {}
+            FileStorage.__fk_index = {}
+            FileStorage.__fk_values = {}
+            FileStorage.__range_index = None
+            FileStorage.__range_values = {}
+            FileStorage.__geo_index = None
+            FileStorage.__text_index = None
+            FileStorage.__indexed = self.__objects
+            if isinstance(self.__objects, LazyObjects):
+                for key in self.__objects:
+                    self.__index(key)
+            else:
+                for key, obj in self.__objects.items():
+                    self.__index(key, obj)
+            FileStorage.__indexed_len = len(self.__objects)
+            return True
+        return False
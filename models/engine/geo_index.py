@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""
+Contains the GeoIndex class, the spatial index of FileStorage
+
+Points are bucketed in a grid of cells of CELL_DEGREES of latitude by
+CELL_DEGREES of longitude; a radius search only looks at the points of the
+cells overlapping the bounding box of the circle.
+
+Usage: python3 -m models.engine.geo_index [points] [queries] [radius_km]
+benchmarks radius searches through the index against a brute-force scan
+of every point.
+"""
+
+import math
+from os import getenv
+import random
+import sys
+import time
+
+# degrees of latitude and longitude covered by one cell of the grid
+CELL_DEGREES = float(getenv("HBNB_GEO_CELL_DEGREES", 0.1))
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """return the great circle distance in km between two points given in
+    degrees"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+         math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """return the (south, west, north, east) box, in degrees, around the
+    circle of radius_km centered on lat, lon; west > east when the box
+    crosses the antimeridian"""
+    dlat = radius_km / KM_PER_DEGREE
+    south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = min(math.cos(math.radians(south)),
+                  math.cos(math.radians(north)))
+    if south <= -90 or north >= 90 or \
+            radius_km >= KM_PER_DEGREE * 180 * cos_lat:
+        return south, -180.0, north, 180.0
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    west = (lon - dlon + 180) % 360 - 180
+    east = (lon + dlon + 180) % 360 - 180
+    return south, west, north, east
+
+
+def in_box(lat, lon, box):
+    """True if the point lat, lon is inside box"""
+    south, west, north, east = box
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return lon >= west or lon <= east
+
+
+class GeoIndex:
+    """keys located by latitude and longitude, for radius searches"""
+
+    def __init__(self, cell_degrees=CELL_DEGREES):
+        """create an empty index with cells of cell_degrees"""
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees))
+        # (row, column): {key: (lat, lon)}
+        self.cells = {}
+        # key: (lat, lon)
+        self.points = {}
+
+    def __len__(self):
+        """return the number of keys"""
+        return len(self.points)
+
+    def __cell(self, lat, lon):
+        """return the (row, column) of the cell of lat, lon"""
+        return (int(math.floor((lat + 90) / self.cell_degrees)),
+                int(math.floor((lon + 180) / self.cell_degrees)) %
+                self.columns)
+
+    def add(self, key, lat, lon):
+        """index key at lat, lon, moving it if it was indexed"""
+        self.remove(key)
+        self.points[key] = (lat, lon)
+        self.cells.setdefault(self.__cell(lat, lon), {})[key] = (lat, lon)
+
+    def remove(self, key):
+        """remove key if it is indexed"""
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        cell = self.__cell(*point)
+        del self.cells[cell][key]
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def box(self, box):
+        """return the list of (key, (lat, lon)) inside box, a (south,
+        west, north, east) tuple in degrees"""
+        south, west, north, east = box
+        (row_min, col_min), (row_max, col_max) = (self.__cell(south, west),
+                                                  self.__cell(north, east))
+        if west <= east:
+            cols = min(self.columns, int(math.floor(
+                (east - west) / self.cell_degrees)) + 2)
+        else:
+            cols = (col_max - col_min) % self.columns + 1
+        if (row_max - row_min + 1) * cols > len(self.cells):
+            # fewer cells in use than in the box: look at all of them
+            candidates = (cell for cell in self.cells
+                          if row_min <= cell[0] <= row_max)
+        else:
+            candidates = ((row, (col_min + i) % self.columns)
+                          for row in range(row_min, row_max + 1)
+                          for i in range(cols))
+        return [(key, point)
+                for cell in candidates
+                for key, point in self.cells.get(cell, {}).items()
+                if in_box(point[0], point[1], box)]
+
+    def within(self, lat, lon, radius_km):
+        """return the list of (distance in km, key) of the keys within
+        radius_km of lat, lon, nearest first"""
+        result = []
+        for key, point in self.box(bounding_box(lat, lon, radius_km)):
+            distance = haversine(lat, lon, point[0], point[1])
+            if distance <= radius_km:
+                result.append((distance, key))
+        result.sort()
+        return result
+
+
+def brute_force(points, lat, lon, radius_km):
+    """return what GeoIndex.within() returns, computing the distance to
+    every one of points, a dictionary of key: (lat, lon)"""
+    result = []
+    for key, point in points.items():
+        distance = haversine(lat, lon, point[0], point[1])
+        if distance <= radius_km:
+            result.append((distance, key))
+    result.sort()
+    return result
+
+
+def benchmark(points=100000, queries=200, radius_km=10.0):
+    """print the time of queries radius searches on points random places
+    of the contiguous United States, with and without the index"""
+    rand = random.Random(0)
+    index = GeoIndex()
+    for i in range(points):
+        index.add(str(i), rand.uniform(25, 49), rand.uniform(-124, -67))
+    centers = [(rand.uniform(25, 49), rand.uniform(-124, -67))
+               for i in range(queries)]
+    start = time.perf_counter()
+    found = [index.within(lat, lon, radius_km) for lat, lon in centers]
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [brute_force(index.points, lat, lon, radius_km)
+                for lat, lon in centers]
+    scanned = time.perf_counter() - start
+    if found != expected:
+        raise AssertionError("index and scan disagree")
+    print("{} points, {} queries of {} km, {:.1f} results per query"
+          .format(points, queries, radius_km,
+                  sum(map(len, found)) / queries))
+    print("index: {:.3f} ms/query".format(1000 * indexed / queries))
+    print("scan:  {:.3f} ms/query".format(1000 * scanned / queries))
+    print("speedup: {:.0f}x".format(scanned / indexed))
+
+
+if __name__ == "__main__":
+    benchmark(*[cast(arg) for cast, arg in zip((int, int, float),
+                                               sys.argv[1:])])
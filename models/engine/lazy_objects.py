@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""
+Contains the LazyObjects class, the __objects of a lazy FileStorage
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from models.engine import binary_format
+
+
+class LazyObjects(MutableMapping):
+    """<class name>.id to object map backed by a binary snapshot
+
+    Objects are only built from their snapshot row the first time they
+    are looked up. Up to cache_size of the objects built that way are kept
+    in a least recently used cache; objects stored with obj[key] = value,
+    because they are new or changed, stay in memory until the next
+    snapshot is written.
+    """
+
+    def __init__(self, buf, hydrate, cache_size):
+        """index the rows of the snapshot in buf, a bytes object or memory
+        map; hydrate(record) builds an object from a snapshot record"""
+        self.__hydrate = hydrate
+        self.__cache_size = cache_size
+        # <class name>.id: (block, row), or None if only in memory
+        self.__rows = {}
+        # <class name>: {<class name>.id: None}
+        self.__keys = {}
+        self.__live = {}
+        self.__cache = OrderedDict()
+        for block in binary_format.blocks(buf) if buf else []:
+            keys = self.__keys.setdefault(block.name, {})
+            ids = block.column("id")
+            for row in range(block.rows):
+                key = block.name + "." + ids[row]
+                self.__rows[key] = (block, row)
+                keys[key] = None
+
+    def __getitem__(self, key):
+        """return the object stored as key, building it if needed"""
+        obj = self.__live.get(key)
+        if obj is not None:
+            return obj
+        obj = self.__cache.get(key)
+        if obj is not None:
+            self.__cache.move_to_end(key)
+            return obj
+        block, row = self.__rows[key]
+        obj = self.__hydrate(block.record(row))
+        self.__cache[key] = obj
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+        return obj
+
+    def __setitem__(self, key, obj):
+        """store obj as key and keep it in memory"""
+        self.__cache.pop(key, None)
+        self.__live[key] = obj
+        if key not in self.__rows:
+            self.__rows[key] = None
+            self.__keys.setdefault(key.split(".", 1)[0], {})[key] = None
+
+    def __delitem__(self, key):
+        """remove key"""
+        del self.__rows[key]
+        del self.__keys[key.split(".", 1)[0]][key]
+        self.__live.pop(key, None)
+        self.__cache.pop(key, None)
+
+    def __contains__(self, key):
+        """True if key is stored, without building its object"""
+        return key in self.__rows
+
+    def __iter__(self):
+        """iterate over the keys"""
+        return iter(list(self.__rows))
+
+    def __len__(self):
+        """return the number of keys"""
+        return len(self.__rows)
+
+    def partition(self, name):
+        """return a read-only view of the objects of class name, of every
+        object if name is None"""
+        if name is None:
+            return LazyPartition(self, self.__rows)
+        return LazyPartition(self, self.__keys.setdefault(name, {}))
+
+    def peek(self, key, attr, default=None):
+        """return attribute attr of the object stored as key, read from the
+        snapshot if the object was not built"""
+        obj = self.loaded(key)
+        if obj is not None:
+            return getattr(obj, attr, default)
+        block, row = self.__rows[key]
+        column = block.column(attr)
+        value = column[row] if column is not None else default
+        return default if value is binary_format.MISSING else value
+
+    def adopt(self, other):
+        """reuse the objects other already built for the keys this map
+        still has, so they keep their identity"""
+        for key, obj in other.built()[-self.__cache_size:]:
+            if key in self.__rows and key not in self.__live:
+                self.__cache[key] = obj
+
+    def loaded(self, key):
+        """return the object stored as key if it was built, None if not"""
+        return self.__live.get(key) or self.__cache.get(key)
+
+    def live(self, key):
+        """return the object stored as key if it is new or changed, None
+        if not"""
+        return self.__live.get(key)
+
+    def built(self):
+        """return the (key, object) pairs already built"""
+        return list(self.__cache.items()) + list(self.__live.items())
+
+
+class LazyPartition(Mapping):
+    """read-only view of the objects of one class of a LazyObjects"""
+
+    def __init__(self, objects, keys):
+        """view the keys of objects listed in keys"""
+        self.__objects = objects
+        self.__keys = keys
+
+    def __getitem__(self, key):
+        """return the object stored as key"""
+        if key not in self.__keys:
+            raise KeyError(key)
+        return self.__objects[key]
+
+    def __contains__(self, key):
+        """True if key is in the view"""
+        return key in self.__keys
+
+    def __iter__(self):
+        """iterate over the keys"""
+        return iter(list(self.__keys))
+
+    def __len__(self):
+        """return the number of keys"""
+        return len(self.__keys)
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+Contains the PoolMetrics class, the connection pool statistics of DBStorage
+
+A PoolMetrics attached to an engine counts the connections checked out of
+its pool, the ones in use and their peak, and, with a MeteredQueuePool,
+how long checkouts waited for a free connection and how many timed out.
+Waits of HBNB_DB_POOL_SLOW_WAIT seconds or more are logged as warnings on
+the models.engine.pool_metrics logger, and with HBNB_DB_POOL_LOG_EVERY set
+the statistics are logged every that many checkouts.
+"""
+
+import logging
+from os import getenv
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# seconds of wait for a connection logged as a warning
+SLOW_WAIT = float(getenv("HBNB_DB_POOL_SLOW_WAIT", 0.1))
+# number of checkouts between two logs of the statistics, 0 for never
+LOG_EVERY = int(getenv("HBNB_DB_POOL_LOG_EVERY", 0))
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool reporting how long each checkout waits to its metrics"""
+
+    # PoolMetrics of the engine, kept when the pool is recreated
+    metrics = None
+
+    def _do_get(self):
+        """check a connection out, timing the wait for it"""
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.timed_out(self)
+            raise
+        if self.metrics is not None:
+            self.metrics.waited(self, time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        """return a new pool like this one, reporting to the same
+        metrics"""
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """checkout and wait statistics of the pool of an engine"""
+
+    def __init__(self):
+        """create empty statistics"""
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """set every statistic back to 0"""
+        with self.__lock:
+            self.checkouts = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.slow_waits = 0
+            self.timeouts = 0
+
+    def attach(self, engine):
+        """collect the statistics of the pool of engine"""
+        event.listen(engine, "checkout", self.__checkout)
+        event.listen(engine, "checkin", self.__checkin)
+        if isinstance(engine.pool, MeteredQueuePool):
+            engine.pool.metrics = self
+
+    def __checkout(self, dbapi_connection, record, proxy):
+        """count a connection leaving the pool"""
+        with self.__lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            log = LOG_EVERY and self.checkouts % LOG_EVERY == 0
+        if log:
+            logger.info("database pool: %s", self.stats())
+
+    def __checkin(self, dbapi_connection, record):
+        """count a connection going back to the pool"""
+        with self.__lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def waited(self, pool, seconds):
+        """record a checkout of pool that waited seconds"""
+        with self.__lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            slow = seconds >= SLOW_WAIT
+            self.slow_waits += slow
+        if slow:
+            logger.warning("waited %.3f s for a database connection: %s",
+                           seconds, pool.status())
+
+    def timed_out(self, pool):
+        """record a checkout of pool that gave up waiting"""
+        with self.__lock:
+            self.timeouts += 1
+        logger.warning("timed out waiting for a database connection: %s",
+                       pool.status())
+
+    def stats(self):
+        """return the statistics as a dictionary"""
+        with self.__lock:
+            return {"checkouts": self.checkouts,
+                    "in_use": self.in_use,
+                    "peak_in_use": self.peak_in_use,
+                    "average_wait": (self.total_wait / self.checkouts
+                                     if self.checkouts else 0.0),
+                    "max_wait": self.max_wait,
+                    "slow_waits": self.slow_waits,
+                    "timeouts": self.timeouts}
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""
+Contains the Query class, the query API shared by the storage engines
+
+    storage.query(Place).filter(city_id=city.id, max_guest__ge=4)
+                        .order_by("-price_by_night").limit(10).all()
+
+filter() keyword arguments are attribute names, optionally followed by
+"__" and one of the operators below; order_by() takes attribute names,
+prefixed by "-" for a descending order. load() asks DBStorage to load
+relationships of the selected objects with the query, instead of one query
+per object when they are read:
+
+    storage.query(State).load("cities", "cities.places").all()
+"""
+
+import operator
+
+# operator name: function comparing an attribute value to the argument
+operators = {"eq": operator.eq, "ne": operator.ne,
+             "lt": operator.lt, "le": operator.le,
+             "gt": operator.gt, "ge": operator.ge,
+             "in": lambda value, values: value in values}
+
+# eager loading strategies of load(): "selectin" runs one more SELECT ...
+# WHERE parent_id IN (...) per relationship, "joined" a LEFT OUTER JOIN in
+# the query itself
+strategies = ("selectin", "joined")
+
+
+def _sort_key(attr):
+    """return the sort key function of attribute attr"""
+    def key(obj):
+        """return (has a value, value) of obj"""
+        value = getattr(obj, attr, None)
+        return (value is not None, 0 if value is None else value)
+    return key
+
+
+class Query:
+    """a query on the objects of one class
+
+    Every method but the ones running the query returns a new Query, so a
+    query can be reused as the base of several others. The storage engine
+    runs it with run(query), which returns the list of matching objects,
+    counts its results with counter(query) and iterates over them
+    batch_size at a time with stream(query, batch_size) if it can do
+    better than running it.
+    """
+
+    def __init__(self, cls, run, counter=None, stream=None):
+        """query the objects of cls; run executes the query"""
+        self.cls = cls
+        self.run = run
+        self.counter = counter
+        self.stream = stream
+        # list of (attribute, operator name, value)
+        self.conditions = []
+        # list of (attribute, descending)
+        self.ordering = []
+        self.limit_count = None
+        self.offset_count = 0
+        # list of (dotted relationship path, strategy)
+        self.eager = []
+
+    def __copy(self):
+        """return a copy of this query to refine"""
+        query = Query(self.cls, self.run, self.counter, self.stream)
+        query.conditions = list(self.conditions)
+        query.ordering = list(self.ordering)
+        query.limit_count = self.limit_count
+        query.offset_count = self.offset_count
+        query.eager = list(self.eager)
+        return query
+
+    def filter(self, **conditions):
+        """return the query restricted to the objects matching every
+        attribute[__operator]=value of conditions"""
+        query = self.__copy()
+        for name, value in conditions.items():
+            attr, _, op = name.partition("__")
+            op = op or "eq"
+            if op not in operators:
+                raise ValueError("unknown operator: " + op)
+            if op == "in":
+                value = list(value)
+            query.conditions.append((attr, op, value))
+        return query
+
+    def order_by(self, *attrs):
+        """return the query sorted by attrs; a "-" prefix sorts by an
+        attribute in descending order"""
+        query = self.__copy()
+        for attr in attrs:
+            query.ordering.append((attr.lstrip("-"), attr.startswith("-")))
+        return query
+
+    def load(self, *paths, strategy="selectin"):
+        """return the query loading the relationships of paths, like
+        "cities" or "cities.places", together with the objects; FileStorage
+        reads relationships from its indexes and ignores it"""
+        if strategy not in strategies:
+            raise ValueError("unknown loading strategy: " + strategy)
+        query = self.__copy()
+        for path in paths:
+            query.eager.append((path, strategy))
+        return query
+
+    def limit(self, count):
+        """return the query returning at most count objects"""
+        query = self.__copy()
+        query.limit_count = count
+        return query
+
+    def offset(self, count):
+        """return the query skipping the first count objects"""
+        query = self.__copy()
+        query.offset_count = count
+        return query
+
+    def all(self):
+        """return the list of the objects matching the query"""
+        return self.run(self)
+
+    def first(self):
+        """return the first object matching the query, None if none does"""
+        objs = self.limit(1).all()
+        return objs[0] if objs else None
+
+    def count(self):
+        """return the number of objects matching the query"""
+        if self.counter is not None:
+            return self.counter(self)
+        return len(self.all())
+
+    def iter(self, batch_size=1000):
+        """return an iterator over the objects matching the query that
+        fetches them batch_size at a time if the storage can"""
+        if self.stream is not None:
+            return self.stream(self, batch_size)
+        return iter(self.all())
+
+    def __iter__(self):
+        """iterate over the objects matching the query"""
+        return iter(self.all())
+
+    def matches(self, obj):
+        """True if obj satisfies every condition of the query"""
+        for attr, op, value in self.conditions:
+            attr_value = getattr(obj, attr, None)
+            if attr_value is None and op not in ("eq", "ne", "in"):
+                return False
+            try:
+                if not operators[op](attr_value, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def sort_and_slice(self, objs):
+        """return the list of objs ordered, offset and limited as the
+        query says; missing values sort first, like SQL NULLs"""
+        objs = list(objs)
+        for attr, descending in reversed(self.ordering):
+            objs.sort(key=_sort_key(attr), reverse=descending)
+        end = None
+        if self.limit_count is not None:
+            end = self.offset_count + self.limit_count
+        return objs[self.offset_count:end]
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""
+Contains the QueryCounter class, the N+1 query detector of DBStorage
+
+A QueryCounter listens to the statements an engine sends to the database
+and counts them per thread between start() and stop(). The same SQL text
+run threshold times or more, with different parameters, is the mark of an
+N+1 pattern: a relationship read once per object of a list instead of
+being loaded with it (see Query.load()).
+
+With HBNB_QUERY_DEBUG set, the Flask apps watched with watch() count the
+queries of every request, send their number in an X-Query-Count header
+when the response is not streamed and emit a QueryWarning for every
+repeated statement, which pytest reports.
+"""
+
+from collections import Counter
+import models
+from os import getenv
+import threading
+import warnings
+from sqlalchemy import event
+
+# number of runs of the same statement in one request flagged as N+1
+THRESHOLD = int(getenv("HBNB_QUERY_DEBUG_THRESHOLD", 5))
+
+
+class QueryWarning(UserWarning):
+    """warning about a statement repeated in a single request"""
+
+
+class QueryCounter:
+    """counts the statements run on engines, per thread"""
+
+    def __init__(self, threshold=THRESHOLD):
+        """create a counter flagging statements run threshold times"""
+        self.threshold = threshold
+        # statements counted by the last with block
+        self.statements = Counter()
+        self.__local = threading.local()
+
+    def attach(self, engine):
+        """count the statements run on engine"""
+        event.listen(engine, "before_cursor_execute", self.__count)
+
+    def detach(self, engine):
+        """stop counting the statements run on engine"""
+        event.remove(engine, "before_cursor_execute", self.__count)
+
+    def __count(self, conn, cursor, statement, parameters, context,
+                executemany):
+        """count statement if the current thread started counting"""
+        statements = getattr(self.__local, "statements", None)
+        if statements is not None:
+            statements[statement] += 1
+
+    def start(self):
+        """start counting the statements of the current thread"""
+        self.__local.statements = Counter()
+
+    def current(self):
+        """return the Counter of the statements the current thread ran
+        since start()"""
+        statements = getattr(self.__local, "statements", None)
+        return statements if statements is not None else Counter()
+
+    def stop(self):
+        """stop counting and return the Counter of the statements the
+        current thread ran since start()"""
+        statements = self.current()
+        self.__local.statements = None
+        return statements
+
+    def repeated(self, statements):
+        """return the list of (statement, runs) of statements run at least
+        threshold times, most run first"""
+        return [(statement, runs)
+                for statement, runs in statements.most_common()
+                if runs >= self.threshold]
+
+    def __enter__(self):
+        """start counting"""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """stop counting; the statements are kept in self.statements"""
+        self.statements = self.stop()
+
+
+def watch(app, storage):
+    """count the queries of every request of the Flask app if
+    HBNB_QUERY_DEBUG is set and storage is a DBStorage"""
+    if not getenv("HBNB_QUERY_DEBUG") or models.storage_t != "db":
+        return
+    from flask import request
+    counter = storage.queries()
+
+    @app.before_request
+    def start_counting():
+        """count the queries of the request"""
+        counter.start()
+
+    @app.after_request
+    def count_header(response):
+        """send the number of queries run so far, which is all of them
+        unless the response is streamed"""
+        if not response.is_streamed:
+            response.headers["X-Query-Count"] = str(
+                sum(counter.current().values()))
+        return response
+
+    @app.teardown_request
+    def report_queries(exception):
+        """flag the statements the request repeated, streamed response
+        included"""
+        statements = counter.stop()
+        for statement, runs in counter.repeated(statements):
+            warnings.warn("{} {}: {} runs of {}".format(
+                request.method, request.path, runs, statement),
+                QueryWarning)
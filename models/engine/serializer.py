@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Contains the JSON encoding used by FileStorage and the API
+
+orjson is used when it is installed, the json module otherwise. The
+HBNB_JSON_BACKEND environment variable ("orjson" or "json") forces one.
+Datetimes are encoded in the same format as BaseModel.to_dict().
+"""
+
+from datetime import datetime
+import json
+from os import getenv
+
+backend = getenv("HBNB_JSON_BACKEND")
+if backend in (None, "orjson"):
+    try:
+        import orjson
+        backend = "orjson"
+    except ImportError:
+        if backend == "orjson":
+            raise
+        backend = "json"
+
+
+def _default(obj):
+    """encode the types json does not know about"""
+    if isinstance(obj, datetime):
+        return obj.isoformat(timespec="microseconds")
+    raise TypeError("Object of type {} is not JSON serializable"
+                    .format(type(obj).__name__))
+
+
+if backend == "orjson":
+    def dumpb(obj):
+        """return obj encoded as JSON bytes"""
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    def dumps(obj):
+        """return obj encoded as a JSON string"""
+        return dumpb(obj).decode("utf-8")
+
+    def loads(s):
+        """return the object decoded from the JSON string or bytes s"""
+        return orjson.loads(s)
+else:
+    def dumpb(obj):
+        """return obj encoded as JSON bytes"""
+        return dumps(obj).encode("utf-8")
+
+    def dumps(obj):
+        """return obj encoded as a JSON string"""
+        return json.dumps(obj, default=_default)
+
+    def loads(s):
+        """return the object decoded from the JSON string or bytes s"""
+        return json.loads(s)
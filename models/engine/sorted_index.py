@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Contains the SortedIndex class, the range index of FileStorage
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class SortedIndex:
+    """keys sorted by a numeric value, for range queries
+
+    The values and the keys are kept in two parallel lists sorted by
+    (value, key), so a range is found with two binary searches and
+    returned as a slice, and a key is found among equal values with a
+    third one.
+    """
+
+    def __init__(self, pairs=()):
+        """create an index of the (value, key) pairs of pairs, sorted once
+        instead of inserted one at a time"""
+        pairs = sorted(pairs)
+        self.values = [value for value, key in pairs]
+        self.keys = [key for value, key in pairs]
+
+    def __len__(self):
+        """return the number of keys"""
+        return len(self.keys)
+
+    def __find(self, value, key):
+        """return the position of key, indexed under value, or of where it
+        goes"""
+        return bisect_left(self.keys, key, bisect_left(self.values, value),
+                           bisect_right(self.values, value))
+
+    def add(self, value, key):
+        """index key under value"""
+        i = self.__find(value, key)
+        self.values.insert(i, value)
+        self.keys.insert(i, key)
+
+    def remove(self, value, key):
+        """remove key, indexed under value"""
+        i = self.__find(value, key)
+        if i == len(self.keys) or self.keys[i] != key or \
+                self.values[i] != value:
+            raise ValueError("{!r} is not indexed under {!r}"
+                             .format(key, value))
+        del self.values[i]
+        del self.keys[i]
+
+    def range(self, low=None, high=None, low_inclusive=True,
+              high_inclusive=True, reverse=False):
+        """return the keys whose value is between low and high, which are
+        unbounded when None, in ascending or descending order of value"""
+        start, end = 0, len(self.values)
+        if low is not None:
+            if low_inclusive:
+                start = bisect_left(self.values, low)
+            else:
+                start = bisect_right(self.values, low)
+        if high is not None:
+            if high_inclusive:
+                end = bisect_right(self.values, high)
+            else:
+                end = bisect_left(self.values, high)
+        keys = self.keys[start:max(start, end)]
+        if reverse:
+            keys.reverse()
+        return keys
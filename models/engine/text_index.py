@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Contains the TextIndex class, the full-text index of FileStorage
+
+Texts are split into lowercase word tokens. Every token has a posting
+list of the keys whose text contains it, with the number of times it
+does, and searches rank the keys with Okapi BM25.
+"""
+
+from collections import Counter
+import math
+import re
+
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+
+_word = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """return the list of lowercase word tokens of text"""
+    return _word.findall(text.lower()) if text else []
+
+
+class TextIndex:
+    """inverted index of the texts of keys, for ranked searches"""
+
+    def __init__(self):
+        """create an empty index"""
+        # token: {key: number of occurrences}
+        self.postings = {}
+        # key: Counter of its tokens
+        self.documents = {}
+        # key: number of tokens of its text
+        self.lengths = {}
+        self.total_length = 0
+
+    def __len__(self):
+        """return the number of keys"""
+        return len(self.documents)
+
+    def add(self, key, text):
+        """index text as the text of key, replacing its previous one"""
+        self.remove(key)
+        counts = Counter(tokenize(text))
+        self.documents[key] = counts
+        self.lengths[key] = sum(counts.values())
+        self.total_length += self.lengths[key]
+        for token, count in counts.items():
+            self.postings.setdefault(token, {})[key] = count
+
+    def remove(self, key):
+        """remove key if it is indexed"""
+        counts = self.documents.pop(key, None)
+        if counts is None:
+            return
+        self.total_length -= self.lengths.pop(key)
+        for token in counts:
+            posting = self.postings[token]
+            del posting[key]
+            if not posting:
+                del self.postings[token]
+
+    def search(self, query, limit=None):
+        """return the list of (score, key) of the keys whose text contains
+        a token of query, best BM25 score first"""
+        count = len(self.documents)
+        if not count:
+            return []
+        average = self.total_length / count or 1
+        scores = {}
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) /
+                           (len(posting) + 0.5))
+            for key, tf in posting.items():
+                norm = K1 * (1 - B + B * self.lengths[key] / average)
+                scores[key] = (scores.get(key, 0) +
+                               idf * tf * (K1 + 1) / (tf + norm))
+        ranked = sorted(((score, key) for key, score in scores.items()),
+                        key=lambda item: -item[0])
+        return ranked[:limit]
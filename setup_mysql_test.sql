@@ -5,3 +5,44 @@ CREATE USER IF NOT EXISTS 'hbnb_test'@'localhost' IDENTIFIED BY 'hbnb_test_pwd';
 GRANT ALL PRIVILEGES ON `hbnb_test_db`.* TO 'hbnb_test'@'localhost';
 GRANT SELECT ON `performance_schema`.* TO 'hbnb_test'@'localhost';
 FLUSH PRIVILEGES;
+
+-- indexes of the models, which create_all() does not add to the tables
+-- of an existing database: add_index(table, index, definition) adds the
+-- index to the table if it exists without it
+DROP PROCEDURE IF EXISTS `hbnb_test_db`.`add_index`;
+DELIMITER //
+CREATE PROCEDURE `hbnb_test_db`.`add_index`(tbl VARCHAR(64), idx VARCHAR(64),
+                                            spec VARCHAR(255))
+BEGIN
+    IF EXISTS (SELECT * FROM information_schema.tables
+               WHERE table_schema = 'hbnb_test_db' AND table_name = tbl)
+       AND NOT EXISTS (SELECT * FROM information_schema.statistics
+                       WHERE table_schema = 'hbnb_test_db'
+                       AND table_name = tbl AND index_name = idx) THEN
+        SET @ddl = CONCAT('ALTER TABLE `hbnb_test_db`.`', tbl, '` ADD ', spec);
+        PREPARE ddl FROM @ddl;
+        EXECUTE ddl;
+        DEALLOCATE PREPARE ddl;
+    END IF;
+END //
+DELIMITER ;
+-- range queries of FileStorage.query() and DBStorage.query()
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_city_id_price_by_night',
+    'INDEX `ix_places_city_id_price_by_night` (`city_id`, `price_by_night`)');
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_number_rooms',
+    'INDEX `ix_places_number_rooms` (`number_rooms`)');
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_number_bathrooms',
+    'INDEX `ix_places_number_bathrooms` (`number_bathrooms`)');
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_max_guest',
+    'INDEX `ix_places_max_guest` (`max_guest`)');
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_price_by_night',
+    'INDEX `ix_places_price_by_night` (`price_by_night`)');
+-- radius searches of nearby()
+CALL `hbnb_test_db`.`add_index`('places', 'ix_places_latitude_longitude',
+    'INDEX `ix_places_latitude_longitude` (`latitude`, `longitude`)');
+-- FULLTEXT indexes of search()
+CALL `hbnb_test_db`.`add_index`('places', 'ft_places_name_description',
+    'FULLTEXT INDEX `ft_places_name_description` (`name`, `description`)');
+CALL `hbnb_test_db`.`add_index`('reviews', 'ft_reviews_text',
+    'FULLTEXT INDEX `ft_reviews_text` (`text`)');
+DROP PROCEDURE `hbnb_test_db`.`add_index`;
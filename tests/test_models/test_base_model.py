@@ -158,3 +158,24 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_from_records(self):
+        """Test from_record() and from_records() rebuild to_dict() output
+        without reporting changes to the storage"""
+        inst = BaseModel()
+        inst.name = "My Model"
+        record = inst.to_dict()
+        with mock.patch('models.storage') as mock_storage:
+            copy = BaseModel.from_record(record)
+            copies = BaseModel.from_records([record, record])
+        self.assertFalse(mock_storage.touch.called)
+        self.assertEqual(record["__class__"], "BaseModel")
+        self.assertEqual(copy.to_dict(), record)
+        self.assertEqual(str(copy), str(inst))
+        self.assertEqual(len(copies), 2)
+        self.assertIsNot(copies[0], copies[1])
+        self.assertEqual(copies[1].created_at, inst.created_at)
+        del record["__class__"]
+        self.assertEqual(BaseModel.from_records([record])[0].to_dict(),
+                         copy.to_dict())
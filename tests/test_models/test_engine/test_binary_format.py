@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Contains the TestBinaryFormat classes
+"""
+
+from datetime import datetime
+import models
+from models.engine import binary_format
+from models.place import Place
+from models.state import State
+import os
+import pep8
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+class TestBinaryFormatDocs(unittest.TestCase):
+    """Tests to check the documentation and style of binary_format"""
+
+    def test_pep8_conformance_binary_format(self):
+        """Test that models/engine/binary_format.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/binary_format.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_binary_format_module_docstring(self):
+        """Test for the binary_format.py module docstring"""
+        self.assertIsNot(binary_format.__doc__, None,
+                         "binary_format.py needs a docstring")
+        self.assertTrue(len(binary_format.__doc__) >= 1,
+                        "binary_format.py needs a docstring")
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Test the binary snapshot format"""
+
+    def setUp(self):
+        """Build a few records of different classes"""
+        place = Place(name="Loft", number_rooms=3, latitude=37.77,
+                      description=None, amenity_ids=["a", "b"])
+        place.is_new = True
+        self.records = [State(name="California").to_dict(raw_dates=True),
+                        place.to_dict(raw_dates=True),
+                        State(name="Nevada", id="not-a-uuid")
+                        .to_dict(raw_dates=True)]
+
+    def test_round_trip(self):
+        """Test that loads gives back the records given to dumps"""
+        loaded = list(binary_format.loads(binary_format.dumps(self.records)))
+        self.assertCountEqual(loaded, self.records)
+
+    def test_random_access(self):
+        """Test that single values can be read without decoding a block"""
+        blocks = binary_format.blocks(binary_format.dumps(self.records))
+        state = [b for b in blocks if b.name == "State"][0]
+        self.assertEqual(state.rows, 2)
+        self.assertEqual(state.column("name")[1], "Nevada")
+        self.assertEqual(state.record(0), self.records[0])
+
+    def test_convert(self):
+        """Test converting json to bin and back keeps every record"""
+        try:
+            binary_format.write("test_convert.json", self.records)
+            binary_format.convert("test_convert.json", "test_convert.bin")
+            binary_format.convert("test_convert.bin", "test_convert.jsonl")
+            self.assertCountEqual(
+                list(binary_format.read("test_convert.jsonl")), self.records)
+            self.assertLess(os.path.getsize("test_convert.bin"),
+                            os.path.getsize("test_convert.json"))
+        finally:
+            for ext in ["json", "bin", "jsonl"]:
+                if os.path.exists("test_convert." + ext):
+                    os.remove("test_convert." + ext)
+
+    def test_convert_command(self):
+        """Test the command line converter does not load the store of the
+        current directory"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(
+            models.__file__)))
+        with tempfile.TemporaryDirectory() as tmp:
+            binary_format.write(os.path.join(tmp, "in.json"), self.records)
+            with open(os.path.join(tmp, "file.json"), "w") as f:
+                f.write("{}")
+            env = dict(os.environ, PYTHONPATH=root)
+            env.pop("HBNB_FILE_PATH", None)
+            done = subprocess.run([sys.executable, "-m",
+                                   "models.engine.binary_format",
+                                   "in.json", "out.bin"],
+                                  cwd=tmp, env=env, capture_output=True,
+                                  text=True, check=True)
+            self.assertEqual(done.stderr, "")
+            self.assertFalse(os.path.exists(os.path.join(tmp,
+                                                         "file.json.lock")))
+            self.assertCountEqual(
+                list(binary_format.read(os.path.join(tmp, "out.bin"))),
+                self.records)
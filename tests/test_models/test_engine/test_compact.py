@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+Contains the TestCompact classes
+"""
+
+from datetime import datetime
+import inspect
+import models
+from models.engine import compact
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+import os
+import pep8
+import unittest
+
+
+class TestCompactDocs(unittest.TestCase):
+    """Tests to check the documentation and style of compact"""
+
+    def test_pep8_conformance_compact(self):
+        """Test that models/engine/compact.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/compact.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_compact_module_docstring(self):
+        """Test for the compact.py module docstring"""
+        self.assertIsNot(compact.__doc__, None,
+                         "compact.py needs a docstring")
+        self.assertTrue(len(compact.__doc__) >= 1,
+                        "compact.py needs a docstring")
+
+    def test_compact_func_docstrings(self):
+        """Test for the presence of docstrings in compact functions"""
+        members = inspect.getmembers(compact, inspect.isfunction)
+        for cls in (compact.Field, compact.CompactModel):
+            members += [(name, func) for name, func in vars(cls).items()
+                        if inspect.isfunction(func)]
+        for name, func in members:
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestCompact(unittest.TestCase):
+    """Test the compact models"""
+
+    def test_same_output(self):
+        """Test to_dict() and __str__ match the model class"""
+        review = Review(place_id="8f0b6c1e-1d2c-4c43-9a0b-3b7b4f0f5a11",
+                        text="Nice")
+        small = compact.compact(Review)(**review.to_dict())
+        self.assertIsInstance(small, Review)
+        self.assertEqual(type(small).__name__, "Review")
+        self.assertEqual(str(small), str(review))
+        self.assertEqual(list(small.to_dict().items()),
+                         list(review.to_dict().items()))
+        self.assertEqual(small.to_dict(raw_dates=True),
+                         review.to_dict(raw_dates=True))
+        loaded = compact.compact(Review).from_record(review.to_dict())
+        self.assertEqual(str(loaded), str(review))
+        self.assertEqual(len(loaded._c_place_id), 16)
+
+    def test_compact_fields(self):
+        """Test uuids and dates are stored compactly and read back"""
+        place = compact.compact(Place)(name="Loft")
+        self.assertIs(compact.compact(Place), type(place))
+        self.assertEqual(len(place._c_id), 16)
+        self.assertIs(type(place._c_created_at), int)
+        self.assertIs(type(place.created_at), datetime)
+        self.assertEqual(place.price_by_night, 0)
+        place.id = "not-a-uuid"
+        self.assertEqual(place.id, "not-a-uuid")
+        place.nickname = "nest"
+        self.assertEqual(place.to_dict()["nickname"], "nest")
+        del place.nickname
+        self.assertNotIn("nickname", place.to_dict())
+        with self.assertRaises(AttributeError):
+            place.nickname
+
+    def test_storage(self):
+        """Test FileStorage builds compact objects when asked to"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_compact.json"
+        try:
+            review = Review(text="Nice")
+            storage.new(review)
+            storage.save()
+            FileStorage._FileStorage__compact = True
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            loaded = storage.get(Review, review.id)
+            self.assertIsInstance(loaded, compact.CompactModel)
+            self.assertEqual(loaded.to_dict(), review.to_dict())
+            loaded.text = "Great"
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(Review, review.id).text, "Great")
+        finally:
+            FileStorage._FileStorage__compact = False
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_compact.json", "test_compact.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
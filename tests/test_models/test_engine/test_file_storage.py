@@ -7,6 +7,8 @@ from datetime import datetime
 import inspect
 import models
 from models.engine import file_storage
+from models.engine import serializer
+from models.engine.compact import compact
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,7 +19,13 @@ from models.user import User
 import json
 import os
 import pep8
+import shutil
+import subprocess
+import sys
+import threading
+import time
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -146,3 +154,741 @@ class TestFileStorage(unittest.TestCase):
         storage.reload()
         count_after_reload = storage.count()
         self.assertEqual(count_after_reload, 3)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_children(self):
+        """Test children returns the objects pointing at a parent"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State(name="California")
+        city1 = City(name="San Francisco", state_id=state.id)
+        city2 = City(name="Oakland", state_id=state.id)
+        other = City(name="Reno", state_id="other")
+        for obj in [state, city1, city2, other]:
+            storage.new(obj)
+        self.assertCountEqual(storage.children(City, "state_id", state.id),
+                              [city1, city2])
+        storage.delete(city1)
+        self.assertEqual(storage.children("City", "state_id", state.id),
+                         [city2])
+        city2.state_id = "other"
+        storage.new(city2)
+        self.assertEqual(storage.children(City, "state_id", state.id), [])
+        self.assertCountEqual(storage.children(City, "state_id", "other"),
+                              [city2, other])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_partition(self):
+        """Test all(cls) returns a read-only view of one class"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        city = City()
+        storage.new(state)
+        storage.new(city)
+        states = storage.all(State)
+        self.assertEqual(dict(states), {"State." + state.id: state})
+        self.assertEqual(dict(storage.all("City")), {"City." + city.id: city})
+        self.assertEqual(len(storage.all(Review)), 0)
+        with self.assertRaises(TypeError):
+            states["State.x"] = state
+        self.assertEqual(storage.count(State), 1)
+        self.assertEqual(storage.count(), 2)
+        storage.delete(state)
+        self.assertEqual(storage.count(State), 0)
+        self.assertEqual(len(storage.all()), 1)
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal(self):
+        """Test journal mode appends changes and reload replays them"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        journal_max = FileStorage._FileStorage__journal_max
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            state = State(name="California")
+            storage.new(state)
+            storage.save()
+            self.assertFalse(os.path.exists("test_journal.json.log"))
+            city = City(name="Fremont", state_id=state.id)
+            storage.new(city)
+            storage.save()
+            storage.delete(state)
+            storage.save()
+            with open("test_journal.json.log") as f:
+                ops = [json.loads(line)["op"] for line in f]
+            self.assertEqual(ops, ["upsert", "delete"])
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(list(storage.all()), ["City." + city.id])
+            FileStorage._FileStorage__journal_max = 0
+            storage.new(State(name="Nevada"))
+            storage.save()
+            self.assertFalse(os.path.exists("test_journal.json.log"))
+            with open("test_journal.json") as f:
+                self.assertEqual(len(json.load(f)), 2)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_max = journal_max
+            for name in ["test_journal.json", "test_journal.json.log",
+                         "test_journal.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_only_changed(self):
+        """Test save only serializes the objects changed since last save"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        states = [State(name=str(i)) for i in range(3)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+        to_dict = State.to_dict
+        with mock.patch.object(State, "to_dict", autospec=True,
+                               side_effect=to_dict) as m:
+            states[1].name = "Renamed"
+            storage.save()
+            self.assertEqual(m.call_count, 1)
+        with open("file.json") as f:
+            js = json.load(f)
+        self.assertEqual(js["State." + states[1].id]["name"], "Renamed")
+        self.assertEqual(js["State." + states[0].id]["name"], "0")
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_group_commit(self):
+        """Test group commit leaves writes to the flusher thread"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        commit = FileStorage._FileStorage__commit
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_group.json"
+        FileStorage._FileStorage__commit = "group"
+        try:
+            state = State(name="California")
+            storage.new(state)
+            storage.save()
+            storage.flush()
+            with open("test_group.json") as f:
+                self.assertIn("State." + state.id, json.load(f))
+            city = City(name="Fremont", state_id=state.id)
+            storage.new(city)
+            storage.save()
+            for i in range(100):
+                if not FileStorage._FileStorage__pending:
+                    break
+                time.sleep(0.05)
+            with open("test_group.json") as f:
+                self.assertIn("City." + city.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__commit = commit
+            for name in ["test_group.json", "test_group.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_group_commit_retry(self):
+        """Test the flusher retries a write that failed, and save()
+        restarts a flusher that stopped"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        commit = FileStorage._FileStorage__commit
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_group/store.json"
+        FileStorage._FileStorage__commit = "group"
+
+        def wait_written():
+            """wait for the flusher to write every pending change"""
+            for i in range(100):
+                if not FileStorage._FileStorage__pending:
+                    break
+                time.sleep(0.05)
+            self.assertEqual(FileStorage._FileStorage__pending, set())
+        try:
+            with self.assertLogs(file_storage.logger, "ERROR"):
+                storage.new(State(name="California"))
+                storage.save()
+                time.sleep(0.2)
+            os.mkdir("test_group")
+            wait_written()
+            stopped = threading.Thread(target=int)
+            stopped.start()
+            stopped.join()
+            FileStorage._FileStorage__flusher = stopped
+            storage.new(State(name="Nevada"))
+            storage.save()
+            self.assertIsNot(FileStorage._FileStorage__flusher, stopped)
+            wait_written()
+            with open("test_group/store.json") as f:
+                self.assertEqual(len(json.load(f)), 2)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__commit = commit
+            shutil.rmtree("test_group", ignore_errors=True)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_only_if_changed(self):
+        """Test reload skips the JSON file unless someone else wrote it"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.assertFalse(storage.changed_on_disk())
+        loads = mock.patch.object(serializer, "loads",
+                                  wraps=serializer.loads)
+        with loads as m:
+            storage.close()
+            self.assertFalse(m.called)
+        other = State(name="Nevada")
+        with open("file.json") as f:
+            js = json.load(f)
+        js["State." + other.id] = other.to_dict()
+        with open("file.json.tmp", "w") as f:
+            json.dump(js, f)
+        os.replace("file.json.tmp", "file.json")
+        self.assertTrue(storage.changed_on_disk())
+        with loads as m:
+            storage.close()
+            self.assertTrue(m.called)
+        self.assertIn("State." + other.id, storage.all(State))
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_json_lines(self):
+        """Test a .jsonl store holds one object per line"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_store.jsonl"
+        try:
+            objs = [State(name="California"), User(email="a@b.c")]
+            for obj in objs:
+                storage.new(obj)
+            storage.save()
+            with open("test_store.jsonl") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(lines, [obj.to_dict() for obj in objs])
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(sorted(storage.all()),
+                             sorted("{}.{}".format(type(obj).__name__, obj.id)
+                                    for obj in objs))
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_store.jsonl", "test_store.jsonl.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_json_lines_torn(self):
+        """Test blank lines and a torn last line of a .jsonl store are
+        skipped, and a broken line before others is an error"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_torn.jsonl"
+        try:
+            objs = [State(name="California"), User(email="a@b.c")]
+            lines = [json.dumps(obj.to_dict()) for obj in objs]
+            with open("test_torn.jsonl", "w") as f:
+                f.write(lines[0] + "\n\n" + lines[1] + "\n" + lines[1][:9])
+            storage.reload()
+            self.assertEqual(len(storage.all()), 2)
+            with open("test_torn.jsonl", "w") as f:
+                f.write(lines[0][:9] + "\n" + lines[1] + "\n")
+            FileStorage._FileStorage__objects = {}
+            with self.assertRaises(ValueError):
+                storage.reload()
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_torn.jsonl", "test_torn.jsonl.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_binary_snapshot(self):
+        """Test a .bin store is saved and reloaded"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_store.bin"
+        try:
+            objs = [State(name="California"), Place(number_rooms=2)]
+            for obj in objs:
+                storage.new(obj)
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            for obj in objs:
+                key = "{}.{}".format(type(obj).__name__, obj.id)
+                self.assertEqual(storage.all()[key].to_dict(), obj.to_dict())
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_store.bin", "test_store.bin.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy(self):
+        """Test a lazy .bin store builds objects on access only"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_lazy.bin"
+        try:
+            state = State(name="California")
+            cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+            for obj in [state] + cities:
+                storage.new(obj)
+            storage.save()
+            FileStorage._FileStorage__lazy = True
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            objects = storage.all()
+            self.assertEqual(objects.built(), [])
+            self.assertEqual(storage.count(City), 3)
+            self.assertEqual(len(storage.snapshot()), 4)
+            self.assertEqual(len(storage.children(City, "state_id",
+                                                  state.id)), 3)
+            for obj in storage.iter(City):
+                storage.to_json(obj)
+            self.assertEqual(FileStorage._FileStorage__fragments, {})
+            loaded = storage.get(State, state.id)
+            loaded.name = "Nevada"
+            storage.to_json(loaded)
+            self.assertEqual(list(FileStorage._FileStorage__fragments),
+                             ["State." + state.id])
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+        finally:
+            FileStorage._FileStorage__lazy = False
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_lazy.bin", "test_lazy.bin.log",
+                         "test_lazy.bin.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy_indexes(self):
+        """Test a lazy store builds its range, geo and text indexes on the
+        first query that needs them"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_lazy.bin"
+        try:
+            places = [Place(name="Loft " + str(i), price_by_night=i * 100,
+                            latitude=37.77, longitude=-122.42)
+                      for i in range(3)]
+            for place in places:
+                storage.new(place)
+            storage.new(Place(name="Nowhere", price_by_night=0))
+            storage.save()
+            FileStorage._FileStorage__lazy = True
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.count(Place), 4)
+            for name in ("range", "geo", "text"):
+                self.assertIsNone(getattr(
+                    FileStorage, "_FileStorage__{}_index".format(name)))
+            self.assertEqual([place.id for place in storage.query(Place)
+                              .filter(price_by_night__ge=100).all()],
+                             [place.id for place in places[1:]])
+            self.assertIsNone(FileStorage._FileStorage__geo_index)
+            self.assertEqual(len(storage.nearby(Place, 37.77, -122.41, 5)),
+                             3)
+            self.assertEqual(storage.nearby(Place, 0, 0, 500), [])
+            self.assertEqual(storage.search(Place, "loft 2")[0][0].id,
+                             places[2].id)
+        finally:
+            FileStorage._FileStorage__lazy = False
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_lazy.bin", "test_lazy.bin.log",
+                         "test_lazy.bin.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_sharded(self):
+        """Test a sharded store only rewrites and rereads changed classes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_shards/"
+        try:
+            state = State(name="California")
+            user = User(email="a@b.c")
+            storage.new(state)
+            storage.new(user)
+            storage.save()
+            self.assertEqual(sorted(os.listdir("test_shards")),
+                             ["State.json", "User.json", "store.lock"])
+            with open("test_shards/User.json") as f:
+                self.assertEqual(list(json.load(f)), ["User." + user.id])
+            user_stat = os.stat("test_shards/User.json")
+            state.name = "Nevada"
+            storage.save()
+            self.assertEqual(os.stat("test_shards/User.json").st_ino,
+                             user_stat.st_ino)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+            self.assertEqual(storage.count(User), 1)
+            with open("test_shards/State.json", "w") as f:
+                f.write("{}")
+            storage.reload()
+            self.assertEqual(storage.count(State), 0)
+            self.assertEqual(storage.count(User), 1)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            if os.path.exists("test_shards"):
+                for name in os.listdir("test_shards"):
+                    os.remove(os.path.join("test_shards", name))
+                os.rmdir("test_shards")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_concurrent_writers(self):
+        """Test a save merges what another process saved in the meantime"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_workers.json"
+        try:
+            state = State(name="California")
+            storage.new(state)
+            storage.save()
+            version = storage.version()
+            env = dict(os.environ, HBNB_FILE_PATH="test_workers.json")
+            subprocess.run([sys.executable, "-c",
+                            "import models\n"
+                            "from models.user import User\n"
+                            "models.storage.new(User(email='a@b.c'))\n"
+                            "models.storage.save()\n"],
+                           env=env, check=True)
+            self.assertTrue(storage.changed_on_disk())
+            self.assertEqual(storage.version(), version + 1)
+            state.name = "Nevada"
+            storage.save()
+            self.assertEqual(storage.count(User), 1)
+            with open("test_workers.json") as f:
+                saved = json.load(f)
+            self.assertEqual(saved["State." + state.id]["name"], "Nevada")
+            self.assertEqual(len(saved), 2)
+            self.assertFalse(storage.changed_on_disk())
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_workers.json", "test_workers.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_first_save_merges(self):
+        """Test the first save of a freshly started worker keeps what
+        another worker saved after it loaded the store"""
+        env = dict(os.environ, HBNB_FILE_PATH="test_fresh.json")
+        script = ("import models, sys\n"
+                  "from models.state import State\n"
+                  "models.storage.reload()\n"
+                  "print('ready', flush=True)\n"
+                  "sys.stdin.readline()\n"
+                  "models.storage.new(State(name=sys.argv[1]))\n"
+                  "models.storage.save()\n")
+        first = None
+        try:
+            first = subprocess.Popen([sys.executable, "-c", script, "A"],
+                                     env=env, stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, text=True)
+            self.assertEqual(first.stdout.readline(), "ready\n")
+            subprocess.run([sys.executable, "-c", script, "B"], env=env,
+                           input="\n", text=True, stdout=subprocess.DEVNULL,
+                           check=True)
+            first.communicate("\n")
+            self.assertEqual(first.returncode, 0)
+            with open("test_fresh.json") as f:
+                names = sorted(obj["name"] for obj in json.load(f).values())
+            self.assertEqual(names, ["A", "B"])
+        finally:
+            if first is not None and first.poll() is None:
+                first.kill()
+                first.wait()
+            for name in ["test_fresh.json", "test_fresh.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_torn(self):
+        """Test an append after a torn journal line starts a new line, and
+        a bad line before the last one is an error"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_torn.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            storage.new(State(name="a"))
+            storage.save()
+            storage.new(State(name="b"))
+            storage.save()
+            with open("test_torn.json.log", "a") as f:
+                f.write('{"op": "upsert", "key": "State.')
+            storage.new(State(name="c"))
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(sorted(state.name for state in
+                                    storage.all(State).values()),
+                             ["a", "b", "c"])
+            with open("test_torn.json.log", "a") as f:
+                f.write('{"op": "upsert"\n{"op": "delete", "key": "x"}\n')
+            FileStorage._FileStorage__objects = {}
+            with self.assertRaises(ValueError):
+                storage.reload()
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_torn.json", "test_torn.json.log",
+                         "test_torn.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_merge_keeps_pending(self):
+        """Test merging a journal another process appended to keeps the
+        changes of this process that are not saved yet"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        path = FileStorage._FileStorage__file_path
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_merge.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            state = State(name="v0")
+            storage.new(state)
+            storage.save()
+            state.name = "v1"
+            storage.save()
+            env = dict(os.environ, HBNB_FILE_PATH="test_merge.json",
+                       HBNB_FILE_JOURNAL="1")
+            subprocess.run([sys.executable, "-c",
+                            "import models\n"
+                            "from models.user import User\n"
+                            "models.storage.new(User(email='a@b.c'))\n"
+                            "models.storage.save()\n"],
+                           env=env, check=True)
+            self.assertTrue(os.path.exists("test_merge.json.log"))
+            state.name = "v2"
+            storage.save()
+            self.assertIs(storage.get(State, state.id), state)
+            self.assertEqual(storage.count(User), 1)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name, "v2")
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = path
+            for name in ["test_merge.json", "test_merge.json.log",
+                         "test_merge.json.lock"]:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_snapshot_views(self):
+        """Test all(cls) and snapshot() do not change under later writes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            first = State(name="California")
+            storage.new(first)
+            states = storage.all(State)
+            everything = storage.snapshot()
+            self.assertIs(storage.all(State), states)
+            for key in states:
+                storage.new(State(name="Nevada"))
+            storage.delete(first)
+            self.assertEqual(list(states), ["State." + first.id])
+            self.assertEqual(list(everything), ["State." + first.id])
+            self.assertEqual(len(storage.all(State)), 1)
+            self.assertNotIn("State." + first.id, storage.snapshot())
+            with self.assertRaises(TypeError):
+                everything["State.x"] = first
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_views_copy_on_write(self):
+        """Test writes copy a partition once after a view of it was handed
+        out, and views never change"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            storage.new(State(name="California"))
+            partition = FileStorage._FileStorage__by_class["State"]
+            storage.new(State(name="Nevada"))
+            self.assertIs(FileStorage._FileStorage__by_class["State"],
+                          partition)
+            view = storage.all(State)
+            states = iter(view.values())
+            storage.new(State(name="Oregon"))
+            partition = FileStorage._FileStorage__by_class["State"]
+            storage.new(State(name="Utah"))
+            self.assertIs(FileStorage._FileStorage__by_class["State"],
+                          partition)
+            self.assertEqual(len(list(states)), 2)
+            self.assertEqual(len(view), 2)
+            self.assertEqual(len(storage.all(State)), 4)
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_nearby(self):
+        """Test nearby() follows inserts, moves and deletes of places"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            sf = Place(name="SF", latitude=37.77, longitude=-122.42)
+            oak = Place(name="Oakland", latitude=37.80, longitude=-122.27)
+            storage.new(sf)
+            storage.new(oak)
+            storage.new(Place(name="Nowhere"))
+            storage.new(compact(Place)(name="Nowhere", latitude=1.0))
+            self.assertEqual(storage.nearby(Place, 0, 0, 500), [])
+            found = storage.nearby(Place, 37.77, -122.41, 20)
+            self.assertEqual([place for place, km in found], [sf, oak])
+            self.assertLess(found[0][1], 1)
+            oak.latitude = 34.05
+            oak.longitude = -118.24
+            self.assertEqual(storage.nearby("Place", 37.77, -122.41, 20),
+                             found[:1])
+            storage.delete(sf)
+            self.assertEqual(storage.nearby(Place, 37.77, -122.41, 20), [])
+            self.assertEqual(storage.nearby(City, 37.77, -122.41, 20), [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search(self):
+        """Test search() follows inserts, edits and deletes of texts"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            place = Place(name="Loft", description="near the beach")
+            review = Review(text="Great beach, great loft")
+            storage.new(place)
+            storage.new(review)
+            self.assertEqual([obj for obj, score in
+                              storage.search(Place, "beach loft")], [place])
+            self.assertEqual([obj for obj, score in
+                              storage.search("Review", "beach")], [review])
+            place.description = "in the mountains"
+            self.assertEqual(storage.search(Place, "beach"), [])
+            storage.delete(review)
+            self.assertEqual(storage.search(Review, "beach"), [])
+            self.assertEqual(storage.search(State, "beach"), [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_unindexed(self):
+        """Test search() scans the texts without keeping a TextIndex when
+        HBNB_FILE_TEXT_INDEX is off"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__text_indexed = False
+        try:
+            place = Place(name="Loft", description="near the beach")
+            storage.new(place)
+            storage.new(Place(name="Cabin", description="in the woods"))
+            self.assertEqual([obj for obj, score in
+                              storage.search(Place, "beach loft")], [place])
+            self.assertEqual(storage.search(State, "beach"), [])
+            self.assertIsNone(FileStorage._FileStorage__text_index)
+        finally:
+            FileStorage._FileStorage__text_indexed = True
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_to_json(self):
+        """Test to_json() is cached until the object changes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            state = State(name="California")
+            self.assertEqual(json.loads(storage.to_json(state)),
+                             state.to_dict())
+            storage.new(state)
+            text = storage.to_json(state)
+            self.assertEqual(json.loads(text), state.to_dict())
+            self.assertIs(storage.to_json(state), text)
+            state.name = "Nevada"
+            self.assertEqual(json.loads(storage.to_json(state))["name"],
+                             "Nevada")
+            FileStorage._FileStorage__compact = True
+            state = compact(State)(name="Utah")
+            storage.new(state)
+            self.assertEqual(json.loads(storage.to_json(state))["name"],
+                             "Utah")
+            self.assertNotIn("State." + state.id,
+                             FileStorage._FileStorage__fragments)
+        finally:
+            FileStorage._FileStorage__compact = False
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_count_many(self):
+        """Test count_many() counts several classes at once"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            for obj in [State(), State(), City()]:
+                storage.new(obj)
+            self.assertEqual(storage.count_many([State, "City", Review]),
+                             {"State": 2, "City": 1, "Review": 0})
+            counts = storage.count_many()
+            self.assertEqual(sorted(counts), sorted(classes))
+            self.assertEqual(sum(counts.values()), 3)
+        finally:
+            FileStorage._FileStorage__objects = save
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoIndex classes
+"""
+
+import inspect
+from models.engine import geo_index
+import pep8
+import random
+import unittest
+GeoIndex = geo_index.GeoIndex
+
+
+class TestGeoIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of geo_index"""
+
+    def test_pep8_conformance_geo_index(self):
+        """Test that models/engine/geo_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/geo_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_index_module_docstring(self):
+        """Test for the geo_index.py module docstring"""
+        self.assertIsNot(geo_index.__doc__, None,
+                         "geo_index.py needs a docstring")
+        self.assertTrue(len(geo_index.__doc__) >= 1,
+                        "geo_index.py needs a docstring")
+
+    def test_geo_index_func_docstrings(self):
+        """Test for the presence of docstrings in geo_index functions"""
+        for name, func in (inspect.getmembers(geo_index, inspect.isfunction) +
+                           inspect.getmembers(GeoIndex, inspect.isfunction)):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestGeoIndex(unittest.TestCase):
+    """Test the GeoIndex class"""
+
+    def test_haversine(self):
+        """Test the distance between San Francisco and Los Angeles"""
+        self.assertAlmostEqual(geo_index.haversine(37.7749, -122.4194,
+                                                   34.0522, -118.2437),
+                               559.1, delta=0.5)
+
+    def test_within_matches_brute_force(self):
+        """Test within() finds what a scan of every point finds, near the
+        poles and across the antimeridian too"""
+        rand = random.Random(0)
+        index = GeoIndex(1.0)
+        for i in range(2000):
+            index.add(i, rand.uniform(-90, 90), rand.uniform(-180, 180))
+        for center in [(0, 179.9, 300), (89.5, 0, 200), (-89.9, 10, 50),
+                       (10, -179.99, 500), (40, -100, 20000), (0, 0, 0)]:
+            with self.subTest(center=center):
+                self.assertEqual(index.within(*center),
+                                 geo_index.brute_force(index.points,
+                                                       *center))
+
+    def test_add_remove(self):
+        """Test add() moves a key and remove() forgets it"""
+        index = GeoIndex()
+        index.add("a", 37.77, -122.42)
+        index.add("a", 34.05, -118.24)
+        self.assertEqual([key for d, key in index.within(34, -118.2, 10)],
+                         ["a"])
+        self.assertEqual(index.within(37.77, -122.42, 10), [])
+        index.remove("a")
+        index.remove("a")
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.cells, {})
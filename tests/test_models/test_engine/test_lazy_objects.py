@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Contains the TestLazyObjects classes
+"""
+
+import inspect
+import models
+from models.engine import binary_format, lazy_objects
+from models.state import State
+import pep8
+import unittest
+LazyObjects = lazy_objects.LazyObjects
+
+
+class TestLazyObjectsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of LazyObjects"""
+
+    def test_pep8_conformance_lazy_objects(self):
+        """Test that models/engine/lazy_objects.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/lazy_objects.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_lazy_objects_func_docstrings(self):
+        """Test for the presence of docstrings in LazyObjects methods"""
+        for name, func in vars(LazyObjects).items():
+            if inspect.isfunction(func):
+                self.assertIsNot(func.__doc__, None,
+                                 "{:s} method needs a docstring".format(name))
+
+
+class TestLazyObjects(unittest.TestCase):
+    """Test the LazyObjects class"""
+
+    def setUp(self):
+        """Build a snapshot of a few states"""
+        self.states = [State(name=str(i)) for i in range(5)]
+        self.buf = binary_format.dumps(s.to_dict(raw_dates=True)
+                                       for s in self.states)
+        self.built = []
+
+    def hydrate(self, record):
+        """Build a State and remember it was built"""
+        self.built.append(record["id"])
+        return State(**record)
+
+    def test_built_on_access(self):
+        """Test objects are only built when looked up"""
+        objects = LazyObjects(self.buf, self.hydrate, 2)
+        self.assertEqual(len(objects), 5)
+        self.assertIn("State." + self.states[0].id, objects)
+        self.assertEqual(self.built, [])
+        self.assertEqual(objects.peek("State." + self.states[1].id, "name"),
+                         "1")
+        self.assertEqual(self.built, [])
+        state = objects["State." + self.states[0].id]
+        self.assertEqual(state.to_dict(), self.states[0].to_dict())
+        self.assertIs(objects["State." + self.states[0].id], state)
+        self.assertEqual(len(self.built), 1)
+
+    def test_lru(self):
+        """Test at most cache_size unchanged objects stay built"""
+        objects = LazyObjects(self.buf, self.hydrate, 2)
+        for state in objects.values():
+            pass
+        self.assertEqual(len(objects.built()), 2)
+        changed = objects["State." + self.states[0].id]
+        objects["State." + self.states[0].id] = changed
+        for state in objects.values():
+            pass
+        self.assertIs(objects["State." + self.states[0].id], changed)
+        self.assertEqual(len(objects.built()), 3)
+
+    def test_partition(self):
+        """Test partition views one class"""
+        objects = LazyObjects(self.buf, self.hydrate, 2)
+        new = State()
+        objects["State." + new.id] = new
+        self.assertEqual(len(objects.partition("State")), 6)
+        self.assertEqual(len(objects.partition("City")), 0)
+        del objects["State." + new.id]
+        self.assertEqual(len(objects.partition("State")), 5)
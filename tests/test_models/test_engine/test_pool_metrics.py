@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Contains the TestPoolMetrics classes
+"""
+
+import inspect
+from models.engine import pool_metrics
+import pep8
+from sqlalchemy import create_engine, exc
+import unittest
+MeteredQueuePool = pool_metrics.MeteredQueuePool
+PoolMetrics = pool_metrics.PoolMetrics
+
+
+class TestPoolMetricsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pool_metrics"""
+
+    def test_pep8_conformance_pool_metrics(self):
+        """Test that models/engine/pool_metrics.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pool_metrics.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pool_metrics_module_docstring(self):
+        """Test for the pool_metrics.py module docstring"""
+        self.assertIsNot(pool_metrics.__doc__, None,
+                         "pool_metrics.py needs a docstring")
+        self.assertTrue(len(pool_metrics.__doc__) >= 1,
+                        "pool_metrics.py needs a docstring")
+
+    def test_pool_metrics_func_docstrings(self):
+        """Test for the presence of docstrings in pool_metrics methods"""
+        for cls in (MeteredQueuePool, PoolMetrics):
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                if name in vars(cls):
+                    self.assertIsNot(func.__doc__, None,
+                                     "{:s} needs a docstring".format(name))
+
+
+class TestPoolMetrics(unittest.TestCase):
+    """Test PoolMetrics on a pool of a single SQLite connection"""
+
+    def setUp(self):
+        """create an engine with a one connection metered pool"""
+        self.engine = create_engine("sqlite://", poolclass=MeteredQueuePool,
+                                    pool_size=1, max_overflow=0,
+                                    pool_timeout=0.05)
+        self.metrics = PoolMetrics()
+        self.metrics.attach(self.engine)
+
+    def tearDown(self):
+        """close the connections"""
+        self.engine.dispose()
+
+    def test_checkouts(self):
+        """Test checkouts and connections in use are counted"""
+        with self.engine.connect():
+            self.assertEqual(self.metrics.in_use, 1)
+        with self.engine.connect():
+            pass
+        stats = self.metrics.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["peak_in_use"], 1)
+        self.assertEqual(stats["timeouts"], 0)
+
+    def test_timeout(self):
+        """Test a checkout waiting for the only connection times out and
+        is counted"""
+        with self.engine.connect():
+            with self.assertLogs(pool_metrics.logger, "WARNING"):
+                with self.assertRaises(exc.TimeoutError):
+                    self.engine.connect()
+        self.assertEqual(self.metrics.stats()["timeouts"], 1)
+
+    def test_recreate(self):
+        """Test the metrics follow the pool through dispose()"""
+        self.engine.dispose()
+        self.assertIs(self.engine.pool.metrics, self.metrics)
+        with self.engine.connect():
+            pass
+        self.assertEqual(self.metrics.checkouts, 1)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.stats()["checkouts"], 0)
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""
+Contains the TestQuery classes
+"""
+
+import inspect
+import models
+from models.city import City
+from models.engine import query
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+import pep8
+import unittest
+Query = query.Query
+
+
+class TestQueryDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the Query class"""
+
+    def test_pep8_conformance_query(self):
+        """Test that models/engine/query.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/query.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_query(self):
+        """Test tests/test_models/test_engine/test_query.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/'
+                                    'test_query.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_query_module_docstring(self):
+        """Test for the query.py module docstring"""
+        self.assertIsNot(query.__doc__, None,
+                         "query.py needs a docstring")
+        self.assertTrue(len(query.__doc__) >= 1,
+                        "query.py needs a docstring")
+
+    def test_query_func_docstrings(self):
+        """Test for the presence of docstrings in Query methods"""
+        for name, func in inspect.getmembers(Query, inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} method needs a docstring".format(name))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestQuery(unittest.TestCase):
+    """Test queries on FileStorage"""
+
+    def setUp(self):
+        """store a few places of two cities"""
+        self.save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        state = State(name="California")
+        self.cities = [City(name=name, state_id=state.id)
+                       for name in ("San Francisco", "Fremont")]
+        self.places = [Place(name=str(i), city_id=self.cities[i % 2].id,
+                             price_by_night=100 * i) for i in range(6)]
+        for obj in [state] + self.cities + self.places:
+            self.storage.new(obj)
+
+    def tearDown(self):
+        """put the objects of the other tests back"""
+        FileStorage._FileStorage__objects = self.save
+
+    def test_filter(self):
+        """Test filter() with an index, with the id and with a scan"""
+        city = self.cities[0]
+        self.assertEqual(
+            sorted(p.name for p in
+                   self.storage.query(Place).filter(city_id=city.id)),
+            ["0", "2", "4"])
+        self.assertEqual(self.storage.query("Place")
+                         .filter(id=self.places[1].id).all(),
+                         [self.places[1]])
+        self.assertEqual(self.storage.query(Place)
+                         .filter(city_id=city.id, price_by_night__ge=200)
+                         .count(), 2)
+        self.assertEqual(self.storage.query(Place)
+                         .filter(name__in=["1", "5"]).count(), 2)
+        self.assertEqual(self.storage.query(Place)
+                         .filter(city_id__in=[city.id, city.id]).count(), 3)
+        self.assertEqual(self.storage.query(Place).filter(
+            id__in=[self.places[1].id, self.places[1].id]).count(), 1)
+        with self.assertRaises(ValueError):
+            self.storage.query(Place).filter(name__like="1")
+
+    def test_order_limit_offset(self):
+        """Test order_by(), limit() and offset()"""
+        places = self.storage.query(Place).order_by("-price_by_night")
+        self.assertEqual([p.name for p in places.limit(2).all()],
+                         ["5", "4"])
+        self.assertEqual([p.name for p in places.offset(4).all()],
+                         ["1", "0"])
+        self.assertEqual(places.offset(1).first().name, "4")
+        self.assertEqual(places.count(), 6)
+        self.assertIsNone(places.filter(name="x").first())
+
+    def test_range(self):
+        """Test range conditions and ordering on a range indexed column"""
+        places = self.storage.query(Place)
+        self.assertEqual(
+            [p.name for p in places.filter(price_by_night__gt=100,
+                                           price_by_night__le=400)
+             .order_by("price_by_night")],
+            ["2", "3", "4"])
+        self.assertEqual(
+            [p.name for p in places.filter(price_by_night__ge=0)
+             .order_by("-price_by_night").offset(1).limit(2)],
+            ["4", "3"])
+        self.places[0].price_by_night = 1000
+        self.assertEqual(places.filter(price_by_night__gt=450).count(), 2)
+        self.assertEqual(places.filter(price_by_night=1000).first(),
+                         self.places[0])
+        self.storage.delete(self.places[0])
+        self.assertEqual(places.filter(price_by_night__gt=450).count(), 1)
+
+    def test_iter(self):
+        """Test iter() streams through the storage when it can"""
+        places = self.storage.query(Place).filter(price_by_night__ge=300)
+        self.assertEqual(sorted(p.name for p in places.iter()),
+                         ["3", "4", "5"])
+        self.assertEqual(sorted(p.name for p in self.storage.iter(Place)),
+                         [str(i) for i in range(6)])
+        batches = []
+        query = Query(Place, None,
+                      stream=lambda q, n: batches.append(n) or iter([]))
+        self.assertEqual(list(query.filter(name="0").iter(50)), [])
+        self.assertEqual(batches, [50])
+
+    def test_load(self):
+        """Test load() records the relationships to load and FileStorage
+        still reads them from its indexes"""
+        states = self.storage.query(State).load("cities", "cities.places")
+        self.assertEqual(states.eager, [("cities", "selectin"),
+                                        ("cities.places", "selectin")])
+        self.assertEqual(states.load("cities", strategy="joined")
+                         .filter(name="California").eager[-1],
+                         ("cities", "joined"))
+        self.assertEqual(len(states.eager), 2)
+        state = states.first()
+        self.assertEqual(sorted(c.name for c in state.cities),
+                         ["Fremont", "San Francisco"])
+        with self.assertRaises(ValueError):
+            self.storage.query(State).load("cities", strategy="lazy")
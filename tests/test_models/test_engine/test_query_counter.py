@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestQueryCounter classes
+"""
+
+import inspect
+from models.engine import query_counter
+import pep8
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+import threading
+import unittest
+QueryCounter = query_counter.QueryCounter
+
+
+class TestQueryCounterDocs(unittest.TestCase):
+    """Tests to check the documentation and style of query_counter"""
+
+    def test_pep8_conformance_query_counter(self):
+        """Test that models/engine/query_counter.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/query_counter.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_query_counter_module_docstring(self):
+        """Test for the query_counter.py module docstring"""
+        self.assertIsNot(query_counter.__doc__, None,
+                         "query_counter.py needs a docstring")
+        self.assertTrue(len(query_counter.__doc__) >= 1,
+                        "query_counter.py needs a docstring")
+
+    def test_query_counter_func_docstrings(self):
+        """Test for the presence of docstrings in query_counter
+        functions"""
+        for name, func in (inspect.getmembers(query_counter,
+                                              inspect.isfunction) +
+                           inspect.getmembers(QueryCounter,
+                                              inspect.isfunction)):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestQueryCounter(unittest.TestCase):
+    """Test the QueryCounter class on an in-memory SQLite engine"""
+
+    def setUp(self):
+        """attach a counter to an engine with a small table"""
+        self.engine = create_engine(
+            "sqlite://", poolclass=StaticPool,
+            connect_args={"check_same_thread": False})
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER, parent INTEGER)"))
+        self.counter = QueryCounter(threshold=3)
+        self.counter.attach(self.engine)
+
+    def tearDown(self):
+        """detach the counter"""
+        self.counter.detach(self.engine)
+        self.engine.dispose()
+
+    def select(self, times):
+        """run times the same SELECT with different parameters"""
+        with self.engine.connect() as conn:
+            for i in range(times):
+                conn.execute(text("SELECT id FROM t WHERE parent = :p"),
+                             {"p": i})
+
+    def test_repeated(self):
+        """Test the same statement run threshold times is flagged"""
+        with self.counter:
+            self.select(3)
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT count(*) FROM t"))
+        statements = self.counter.statements
+        self.assertEqual(sum(statements.values()), 4)
+        self.assertEqual(self.counter.repeated(statements),
+                         [("SELECT id FROM t WHERE parent = ?", 3)])
+        with self.counter:
+            self.select(2)
+        self.assertEqual(self.counter.repeated(self.counter.statements), [])
+
+    def test_start_stop(self):
+        """Test only the statements between start() and stop() count"""
+        self.select(1)
+        self.counter.start()
+        self.select(2)
+        self.assertEqual(sum(self.counter.current().values()), 2)
+        self.assertEqual(sum(self.counter.stop().values()), 2)
+        self.select(1)
+        self.assertEqual(sum(self.counter.stop().values()), 0)
+
+    def test_threads(self):
+        """Test every thread counts its own statements"""
+        counts = []
+
+        def run():
+            """count the statements of this thread"""
+            self.counter.start()
+            self.select(5)
+            counts.append(sum(self.counter.stop().values()))
+        self.counter.start()
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        self.assertEqual(counts, [5])
+        self.assertEqual(sum(self.counter.stop().values()), 0)
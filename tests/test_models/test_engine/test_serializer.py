@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializer classes
+"""
+
+from datetime import datetime
+import models
+from models.engine import serializer
+from models.state import State
+import pep8
+import unittest
+
+
+class TestSerializerDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the serializer"""
+
+    def test_pep8_conformance_serializer(self):
+        """Test that models/engine/serializer.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializer.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializer_module_docstring(self):
+        """Test for the serializer.py module docstring"""
+        self.assertIsNot(serializer.__doc__, None,
+                         "serializer.py needs a docstring")
+        self.assertTrue(len(serializer.__doc__) >= 1,
+                        "serializer.py needs a docstring")
+
+
+class TestSerializer(unittest.TestCase):
+    """Test the serializer functions"""
+
+    def test_round_trip(self):
+        """Test that loads reverses dumps"""
+        obj = {"name": "California", "number": 89, "ids": ["a", "b"]}
+        self.assertEqual(serializer.loads(serializer.dumps(obj)), obj)
+        self.assertEqual(serializer.loads(serializer.dumpb(obj)), obj)
+
+    def test_datetime_format(self):
+        """Test datetimes are encoded like BaseModel.to_dict() does"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        for dt in [datetime(2017, 9, 28, 21, 5, 54, 119427),
+                   datetime(2017, 9, 28, 21, 5, 54)]:
+            with self.subTest(dt=dt):
+                self.assertEqual(serializer.loads(serializer.dumps(dt)),
+                                 dt.strftime(t_format))
+
+    def test_raw_dates(self):
+        """Test encoding to_dict(raw_dates=True) matches to_dict()"""
+        state = State(name="California")
+        self.assertEqual(
+            serializer.loads(serializer.dumps(state.to_dict(raw_dates=True))),
+            state.to_dict())
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Contains the TestSortedIndex classes
+"""
+
+import inspect
+from models.engine import sorted_index
+import pep8
+import unittest
+SortedIndex = sorted_index.SortedIndex
+
+
+class TestSortedIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SortedIndex"""
+
+    def test_pep8_conformance_sorted_index(self):
+        """Test that models/engine/sorted_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sorted_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sorted_index_module_docstring(self):
+        """Test for the sorted_index.py module docstring"""
+        self.assertIsNot(sorted_index.__doc__, None,
+                         "sorted_index.py needs a docstring")
+        self.assertTrue(len(sorted_index.__doc__) >= 1,
+                        "sorted_index.py needs a docstring")
+
+    def test_sorted_index_func_docstrings(self):
+        """Test for the presence of docstrings in SortedIndex methods"""
+        for name, func in inspect.getmembers(SortedIndex,
+                                             inspect.isfunction):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} method needs a docstring".format(name))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+
+    def setUp(self):
+        """index keys a to f under 10, 20, 20, 30, 40, 50"""
+        self.index = SortedIndex()
+        for key, value in zip("fbcaed", [50, 20, 20, 10, 40, 30]):
+            self.index.add(value, key)
+
+    def test_range(self):
+        """Test range() with open, closed and missing bounds"""
+        self.assertEqual(self.index.range(), list("abcdef"))
+        self.assertEqual(self.index.range(20, 40), list("bcde"))
+        self.assertEqual(self.index.range(20, 40, False, False), ["d"])
+        self.assertEqual(self.index.range(high=20, reverse=True),
+                         list("cba"))
+        self.assertEqual(self.index.range(45), ["f"])
+        self.assertEqual(self.index.range(60), [])
+        self.assertEqual(self.index.range(30, 20), [])
+
+    def test_remove(self):
+        """Test remove() takes out the key among equal values"""
+        self.index.remove(20, "b")
+        self.assertEqual(self.index.range(20, 20), ["c"])
+        self.assertEqual(len(self.index), 5)
+        with self.assertRaises(ValueError):
+            self.index.remove(20, "b")
+
+    def test_pairs(self):
+        """Test an index built from pairs matches one built by add()"""
+        index = SortedIndex(zip([50, 20, 20, 10, 40, 30], "fcbaed"))
+        self.assertEqual(index.values, self.index.values)
+        self.assertEqual(index.keys, self.index.keys)
+        index.add(20, "bb")
+        self.assertEqual(index.range(20, 20), ["b", "bb", "c"])
+        index.remove(20, "bb")
+        with self.assertRaises(ValueError):
+            index.remove(30, "c")
+        self.assertEqual(len(index), 6)
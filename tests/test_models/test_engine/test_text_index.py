@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Contains the TestTextIndex classes
+"""
+
+import inspect
+from models.engine import text_index
+import pep8
+import unittest
+TextIndex = text_index.TextIndex
+
+
+class TestTextIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of text_index"""
+
+    def test_pep8_conformance_text_index(self):
+        """Test that models/engine/text_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/text_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_text_index_module_docstring(self):
+        """Test for the text_index.py module docstring"""
+        self.assertIsNot(text_index.__doc__, None,
+                         "text_index.py needs a docstring")
+        self.assertTrue(len(text_index.__doc__) >= 1,
+                        "text_index.py needs a docstring")
+
+    def test_text_index_func_docstrings(self):
+        """Test for the presence of docstrings in text_index functions"""
+        for name, func in (inspect.getmembers(text_index,
+                                              inspect.isfunction) +
+                           inspect.getmembers(TextIndex, inspect.isfunction)):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(name))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class"""
+
+    def setUp(self):
+        """index three short texts"""
+        self.index = TextIndex()
+        self.index.add("a", "A quiet loft near the beach")
+        self.index.add("b", "Mountain cabin, quiet and remote")
+        self.index.add("c", "The beach! The BEACH! Right on the beach")
+
+    def test_tokenize(self):
+        """Test tokenize() lowercases and splits on non word characters"""
+        self.assertEqual(text_index.tokenize("Loft, near the BEACH!"),
+                         ["loft", "near", "the", "beach"])
+        self.assertEqual(text_index.tokenize(None), [])
+
+    def test_search(self):
+        """Test search() ranks by BM25"""
+        self.assertEqual([key for score, key in self.index.search("beach")],
+                         ["c", "a"])
+        self.assertEqual([key for score, key in
+                          self.index.search("quiet loft", 1)], ["a"])
+        self.assertEqual(self.index.search("castle"), [])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_add_remove(self):
+        """Test add() replaces the text of a key and remove() drops it"""
+        self.index.add("b", "Beach house")
+        self.assertEqual(self.index.search("mountain"), [])
+        self.assertEqual(len(self.index.search("beach")), 3)
+        self.index.remove("c")
+        self.index.remove("c")
+        self.assertNotIn("right", self.index.postings)
+        self.assertEqual(len(self.index), 2)
@@ -6,13 +6,15 @@ starts a Flask web application
 from flask import Flask, render_template
 from models import *
 from models import storage
+from models.engine.query_counter import watch
 app = Flask(__name__)
+watch(app, storage)
 
 
 @app.route('/hbnb_filters', strict_slashes=False)
 def filters():
     """display a HTML page like 6-index.html from static"""
-    states = storage.all("State").values()
+    states = storage.query("State").load("cities").all()
     amenities = storage.all("Amenity").values()
     return render_template('10-hbnb_filters.html', states=states,
                            amenities=amenities)
@@ -6,13 +6,15 @@ starts a Flask web application
 from flask import Flask, render_template
 from models import *
 from models import storage
+from models.engine.query_counter import watch
 app = Flask(__name__)
+watch(app, storage)
 
 
 @app.route('/cities_by_states', strict_slashes=False)
 def cities_by_states():
     """display the states and cities listed in alphabetical order"""
-    states = storage.all("State").values()
+    states = storage.query("State").load("cities").all()
     return render_template('8-cities_by_states.html', states=states)
 
 